@@ -0,0 +1,29 @@
+"""JSON encode/decode shim for the NDJSON hot path.
+
+Uses orjson when available (3-10x faster decode, emits bytes directly);
+falls back to the stdlib so the tool keeps zero hard dependencies.
+dumps/dumps_pretty always return bytes to avoid a second encode pass.
+"""
+import json as _json
+
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+if _orjson is not None:
+    loads = _orjson.loads
+
+    def dumps(obj) -> bytes:
+        return _orjson.dumps(obj)
+
+    def dumps_pretty(obj) -> bytes:
+        return _orjson.dumps(obj, option=_orjson.OPT_INDENT_2)
+else:
+    loads = _json.loads
+
+    def dumps(obj) -> bytes:
+        return _json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def dumps_pretty(obj) -> bytes:
+        return _json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
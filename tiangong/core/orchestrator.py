@@ -1,12 +1,20 @@
 import json
 import hashlib
+import os
 import uuid
 from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
-
-from .reducer import reduce_events, read_events
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .reducer import (
+    ReplayResult,
+    StatusReducer,
+    read_events,
+    sha256_hex,
+    sort_events,
+    write_derived,
+)
 from .state_manager import StateManager
 from .skill_registry import SkillRegistry
 from .skill_router import SkillRouter
@@ -23,6 +31,7 @@ class OrchestratorConfig:
     worker_timeout_minutes: int = 30  # Worker 超时时间
     max_retries: int = 3  # 最大重试次数
     retry_delay_seconds: int = 60  # 重试间隔（秒）
+    now_fn: Optional[Callable[[], datetime]] = None  # 测试可注入固定时钟
 
 
 class Orchestrator:
@@ -34,6 +43,79 @@ class Orchestrator:
         self.labels = self.team.get("labels", {})
         self.session_label = self.labels.get("orchestrator")
         self.sm = StateManager(self.base_dir)
+        # incremental reduce cache: fold state plus the byte offset of the
+        # last fully consumed line in events.ndjson
+        self._reducer: Optional[StatusReducer] = None
+        self._events_offset = 0
+        self._events_ino: Optional[int] = None
+        self._line_base = 0
+        self._corrupted: List[dict] = []
+
+    def _reset_reduce_cache(self):
+        self._reducer = StatusReducer()
+        self._events_offset = 0
+        self._line_base = 0
+        self._corrupted = []
+
+    def _reduce_incremental(self, emit_derived: bool = True) -> ReplayResult:
+        """reduce_events 的增量版本：复用内存中的 fold 状态，只解析上次调用
+        之后追加的字节。日志被截断/替换或追加乱序时退回整体重放。"""
+        events_path = self.base_dir / "audit" / "events.ndjson"
+        try:
+            st = os.stat(events_path)
+            size, ino = st.st_size, st.st_ino
+        except OSError:
+            size, ino = 0, None
+
+        if self._reducer is None or ino != self._events_ino or size < self._events_offset:
+            self._reset_reduce_cache()
+            self._events_ino = ino
+
+        new_events: List[dict] = []
+        for _ in range(2):
+            if size <= self._events_offset:
+                break
+            with open(events_path, "rb") as f:
+                f.seek(self._events_offset)
+                data = f.read(size - self._events_offset)
+            # 只消费完整行；写到一半的行留给下一次调用
+            end = data.rfind(b"\n") + 1
+            if not end:
+                break
+            chunk = data[:end]
+            new_events, corrupted = read_events(events_path, data=chunk)
+            sort_events(new_events)
+            if new_events and int(new_events[0].get("sequenceNumber", 0)) < self._reducer.last_sequence:
+                # 新增事件的序号早于已 fold 的状态，只能整体重放
+                self._reset_reduce_cache()
+                new_events = []
+                continue
+            for c in corrupted:
+                c["line"] += self._line_base
+            self._corrupted.extend(corrupted)
+            self._line_base += chunk.count(b"\n")
+            self._events_offset += end
+            break
+
+        for event in new_events:
+            self._reducer.fold(event)
+        status = self._reducer.finalize()
+
+        alerts = []
+        if self._corrupted:
+            for c in self._corrupted:
+                alerts.append({
+                    "type": "corrupted_line",
+                    "line": c["line"],
+                    "reason": c["reason"],
+                    "hash": sha256_hex(c["raw"]),
+                })
+            status["alerts"].extend(alerts)
+
+        if emit_derived:
+            write_derived(self.base_dir / "derived", self._reducer.verdict_events, status)
+
+        return ReplayResult(status=status, corrupted_lines=list(self._corrupted), alerts=alerts)
 
     def _load_team(self) -> dict:
         team_path = self.base_dir / "team.json"
@@ -53,6 +135,8 @@ class Orchestrator:
             return None
 
     def _now(self) -> datetime:
+        if self.config.now_fn is not None:
+            return self.config.now_fn()
         return datetime.now(timezone.utc)
 
     def _build_event(self, *, etype: str, task_id: Optional[str], run_id_str: Optional[str], payload: dict,
@@ -201,17 +285,17 @@ class Orchestrator:
         )
         self.sm.append_event(unresp_event)
 
-    def _dispatch_pending_tasks(self, status: dict):
-        """自动派发 pending 任务（无 gates 阻塞）"""
+    def _dispatch_pending_tasks(self, status: dict) -> List[str]:
+        """自动派发 pending 任务（无 gates 阻塞），返回派发的 runId 列表"""
+        dispatched: List[str] = []
         if status.get("project", {}).get("halted"):
-            return  # 项目已 halt，不派发
+            return dispatched  # 项目已 halt，不派发
 
         project_locks = status.get("locks", {}).get("project")
         if project_locks == "running":
             pass  # 允许并行派发
 
         tasks = status.get("tasks", [])
-        dispatched = 0
 
         # 获取当前所有 tasks 的最后 runId 列表
         last_runs = {}
@@ -266,7 +350,7 @@ class Orchestrator:
                 idempotency_key=f"{self.project}:{task_id}:{run_id_val}:WORKER_RUN_STARTED",
             )
             self.sm.append_event(started_event)
-            dispatched += 1
+            dispatched.append(run_id_val)
 
         return dispatched
 
@@ -280,7 +364,7 @@ class Orchestrator:
             system_prompt = f"You are a Worker for project {self.project}."
 
         # 加载任务规格
-        status = reduce_events(self.base_dir, emit_derived=False).status
+        status = self._reduce_incremental(emit_derived=False).status
         task_spec = {}
         for t in status.get("tasks", []):
             if t.get("taskId") == task_id:
@@ -417,19 +501,19 @@ Project Root: {self.team.get('path', str(self.base_dir))}
             )
             self.sm.append_event(close_event)
 
-    def _auto_retry_blocked(self, status: dict) -> int:
+    def _auto_retry_blocked(self, status: dict) -> List[str]:
         """
         自动重试 blocked 任务（可选功能，默认关闭）
         需要配置 max_retries 才生效
 
         Returns:
-            重试的任务数
+            重试的任务 ID 列表
         """
+        retried: List[str] = []
         if self.config.max_retries <= 0:
-            return 0  # 自动重试关闭
+            return retried  # 自动重试关闭
 
         tasks = status.get("tasks", [])
-        retried = 0
 
         for task in tasks:
             task_id = task.get("taskId")
@@ -471,7 +555,7 @@ Project Root: {self.team.get('path', str(self.base_dir))}
                 "idempotencyKey": f"{self.project}:{task_id}:{new_run}:TASK_RETRIED:{retry_count + 1}",
             })
 
-            retried += 1
+            retried.append(task_id)
 
         return retried
 
@@ -607,7 +691,7 @@ Project Root: {self.team.get('path', str(self.base_dir))}
         if not task_id:
             return True
 
-        status = reduce_events(self.base_dir, emit_derived=False).status
+        status = self._reduce_incremental(emit_derived=False).status
         expected = status.get("locks", {}).get("tasks", {}).get(task_id)
 
         if actor in ("worker", "watchdog"):
@@ -780,7 +864,7 @@ Project Root: {self.team.get('path', str(self.base_dir))}
             return False
 
         # 查找任务对应的 run
-        status = reduce_events(self.base_dir, emit_derived=False).status
+        status = self._reduce_incremental(emit_derived=False).status
         task_locks = status.get("locks", {}).get("tasks", {})
         expected_run = task_locks.get(task_id)
 
@@ -853,7 +937,7 @@ Project Root: {self.team.get('path', str(self.base_dir))}
         return {"status": "ignored", "reason": "no_handler"}
 
     def suggest_skills(self, status: Optional[dict] = None) -> List[str]:
-        status = status or reduce_events(self.base_dir, emit_derived=False).status
+        status = status or self._reduce_incremental(emit_derived=False).status
         registry = SkillRegistry.load(self.base_dir / "registry.json")
         memory = self.team.get("defaults", {}).get("skillMemory", {})
         router = SkillRouter(registry, memory)
@@ -974,7 +1058,7 @@ Project Root: {self.team.get('path', str(self.base_dir))}
         self._reconcile_open_runs(events)
 
         # Recompute status after enforcement
-        result = reduce_events(self.base_dir)
+        result = self._reduce_incremental()
 
         # Auto-dispatch pending tasks (Phase 1: minimal dispatch)
         dispatched = self._dispatch_pending_tasks(result.status)
@@ -992,7 +1076,10 @@ Project Root: {self.team.get('path', str(self.base_dir))}
         self._check_worker_evidence_files()
 
         # Recompute status after dispatch/timeout/retry
-        result = reduce_events(self.base_dir)
+        result = self._reduce_incremental()
+        # 把本次 tick 的动作回填给调用方，免得再扫一遍事件日志
+        result.dispatched_runs = dispatched
+        result.retried_tasks = retried
         self.sm.write_status(result.status)
         return result
 
@@ -5,14 +5,17 @@ import zlib
 from dataclasses import asdict, dataclass, field
 from typing import Any, Dict, List, Optional, Literal, Union
 
-
-def canonical_json(event: Dict[str, Any]) -> str:
+def canonical_json_bytes(event: Dict[str, Any]) -> bytes:
+    # the CRC canonical form is pinned to the stdlib encoder: orjson formats
+    # exponent floats differently (1e-7 vs the stdlib's 1e-07), so events
+    # written with orjson present would fail verification without it and
+    # vice versa. Hot-path serialization still goes through jsonx/orjson.
     event_copy = {**event, "crc32": ""}
-    return json.dumps(event_copy, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return json.dumps(event_copy, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
 
 
-def canonical_json_bytes(event: Dict[str, Any]) -> bytes:
-    return canonical_json(event).encode("utf-8")
+def canonical_json(event: Dict[str, Any]) -> str:
+    return canonical_json_bytes(event).decode("utf-8")
 
 
 def compute_crc32(event: Dict[str, Any]) -> str:
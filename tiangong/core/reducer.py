@@ -1,4 +1,4 @@
-import json
+import mmap
 import os
 import hashlib
 from dataclasses import dataclass, field
@@ -6,6 +6,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+from . import jsonx
 from .protocol import verify_crc32
 from .state_manager import atomic_write_json
 
@@ -29,6 +30,7 @@ class TaskState:
     run_id: Optional[str] = None
     run_status: RunStatus = field(default_factory=RunStatus)
     skill_decision: dict = field(default_factory=dict)
+    latest_skill_decision_seq: int = 0
     policy_tier: Optional[str] = None
     last_evidence: dict = field(default_factory=dict)
     last_verdict: dict = field(default_factory=dict)
@@ -41,6 +43,9 @@ class ReplayResult:
     status: dict
     corrupted_lines: list
     alerts: list
+    # filled in by Orchestrator.tick(): what this tick actually did
+    retried_tasks: list = field(default_factory=list)
+    dispatched_runs: list = field(default_factory=list)
 
 
 def utc_now() -> str:
@@ -51,38 +56,87 @@ def sha256_hex(s: str) -> str:
     return hashlib.sha256(s.encode("utf-8")).hexdigest()
 
 
-def read_events(events_path: Path) -> Tuple[List[dict], List[dict]]:
+def _iter_mmap_lines(mm):
+    start = 0
+    size = len(mm)
+    while start < size:
+        nl = mm.find(b"\n", start)
+        if nl == -1:
+            yield mm[start:size]
+            return
+        yield mm[start:nl]
+        start = nl + 1
+
+
+def _parse_lines(lines, events: List[dict], corrupted: List[dict]):
+    for idx, line in enumerate(lines, start=1):
+        raw = line.decode("utf-8", errors="replace").strip()
+        if not raw:
+            continue
+        try:
+            event = jsonx.loads(raw)
+        except Exception as e:
+            corrupted.append({
+                "line": idx,
+                "reason": f"json_decode_error: {e}",
+                "raw": raw,
+            })
+            continue
+        # crc32 check
+        if not verify_crc32(event):
+            corrupted.append({
+                "line": idx,
+                "reason": "crc_mismatch",
+                "raw": raw,
+            })
+            continue
+        events.append(event)
+
+
+def read_events(events_path: Path, data: Optional[bytes] = None) -> Tuple[List[dict], List[dict]]:
     events = []
     corrupted = []
-    if not events_path.exists():
+    if data is not None:
+        _parse_lines(data.splitlines(), events, corrupted)
         return events, corrupted
 
-    with open(events_path, "r", encoding="utf-8", errors="replace") as f:
-        for idx, line in enumerate(f, start=1):
-            raw = line.strip()
-            if not raw:
-                continue
-            try:
-                event = json.loads(raw)
-            except Exception as e:
-                corrupted.append({
-                    "line": idx,
-                    "reason": f"json_decode_error: {e}",
-                    "raw": raw,
-                })
-                continue
-            # crc32 check
-            if not verify_crc32(event):
-                corrupted.append({
-                    "line": idx,
-                    "reason": "crc_mismatch",
-                    "raw": raw,
-                })
-                continue
-            events.append(event)
+    # map the file and walk lines in place instead of copying it into a
+    # str/bytes object first; only the individual line slices are materialized
+    try:
+        f = open(events_path, "rb")
+    except FileNotFoundError:
+        return events, corrupted
+    with f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file cannot be mapped
+            return events, corrupted
+        with mm:
+            _parse_lines(_iter_mmap_lines(mm), events, corrupted)
     return events, corrupted
 
 
+def _sort_key(event: dict):
+    return (int(event.get("sequenceNumber", 0)), event.get("eventId", ""))
+
+
+def is_seq_sorted(events: List[dict]) -> bool:
+    # the log is append-only with monotonic sequence numbers, so this
+    # linear check almost always lets callers skip the O(N log N) sort
+    prev = None
+    for event in events:
+        key = _sort_key(event)
+        if prev is not None and key < prev:
+            return False
+        prev = key
+    return True
+
+
+def sort_events(events: List[dict]):
+    if not is_seq_sorted(events):
+        events.sort(key=_sort_key)
+
+
 def apply_gate(task: TaskState, gate: str, add: bool):
     if add:
         task.gates.add(gate)
@@ -133,104 +187,119 @@ def build_base_status(project_name: str) -> dict:
     }
 
 
-def reduce_events(base_dir: Path, emit_derived: bool = True) -> ReplayResult:
-    base_dir = Path(base_dir)
-    audit_dir = base_dir / "audit"
-    derived_dir = base_dir / "derived"
-    events_path = audit_dir / "events.ndjson"
+class StatusReducer:
+    """Resumable fold over an ordered event stream.
 
-    events, corrupted = read_events(events_path)
-    # sort by sequenceNumber (fallback to 0)
-    events.sort(key=lambda e: (int(e.get("sequenceNumber", 0)), e.get("eventId", "")))
+    Keeps only fold state; finalize() builds a fresh status dict on each
+    call, so a long-lived reducer can keep folding newly appended events
+    between snapshots instead of replaying the full log.
+    """
 
-    project_name = None
-    status = build_base_status("unknown")
-    tasks: Dict[str, TaskState] = {}
-    open_runs: Dict[str, List[str]] = {}
-    locks_project_running = False
+    RUN_BOUND_TYPES = {
+        "WORKER_RUN_STARTED",
+        "WORKER_RUN_COMPLETED",
+        "WORKER_RUN_FAILED",
+        "WORKER_RUN_ABORTED",
+        "EVIDENCE_SUBMITTED",
+        "WATCHDOG_VERDICT",
+        "HUMAN_VERDICT",
+    }
 
-    def get_task(tid: str) -> TaskState:
-        if tid not in tasks:
-            tasks[tid] = TaskState(task_id=tid)
-        return tasks[tid]
+    def __init__(self):
+        self.project_name = None
+        self.project = {
+            "name": "unknown",
+            "phase": "running",
+            "halted": False,
+            "mode": "normal",
+            "degradedReason": None,
+        }
+        self.watchdog = {"lastHeartbeatAt": None, "state": "healthy"}
+        self.risks = []
+        self.alerts = []
+        self.tasks: Dict[str, TaskState] = {}
+        self.open_runs: Dict[str, List[str]] = {}
+        self.locks_project_running = False
+        self.seen_keys = set()
+        self.verdict_events: List[dict] = []
+        self.last_sequence = 0
+
+    def get_task(self, tid: str) -> TaskState:
+        if tid not in self.tasks:
+            self.tasks[tid] = TaskState(task_id=tid)
+        return self.tasks[tid]
+
+    def fold(self, event: dict):
+        etype = event.get("type")
+        if etype == "WATCHDOG_VERDICT":
+            self.verdict_events.append(event)
 
-    seen_keys = set()
+        self.last_sequence = max(self.last_sequence, int(event.get("sequenceNumber", 0)))
 
-    for event in events:
         key = event.get("idempotencyKey")
         if key:
-            if key in seen_keys:
-                continue
-            seen_keys.add(key)
+            if key in self.seen_keys:
+                return
+            self.seen_keys.add(key)
 
-        etype = event.get("type")
-        project_name = event.get("project") or project_name or "unknown"
-        status["project"]["name"] = project_name
+        self.project_name = event.get("project") or self.project_name or "unknown"
+        self.project["name"] = self.project_name
 
         task_id = event.get("taskId")
         run_id = event.get("runId")
         payload = event.get("payload", {}) or {}
 
         if etype == "TEAM_CREATED":
-            status["project"]["name"] = project_name
+            pass
         elif etype == "PROJECT_STARTED":
-            locks_project_running = True
-            status["project"]["phase"] = "running"
+            self.locks_project_running = True
+            self.project["phase"] = "running"
         elif etype == "PROJECT_FINISHED":
-            locks_project_running = False
-            status["project"]["phase"] = "finished"
-            status["project"]["halted"] = False
+            self.locks_project_running = False
+            self.project["phase"] = "finished"
+            self.project["halted"] = False
         elif etype == "PROJECT_HALTED":
-            status["project"]["halted"] = True
-            status["project"]["phase"] = "halted"
-            locks_project_running = False
+            self.project["halted"] = True
+            self.project["phase"] = "halted"
+            self.locks_project_running = False
         elif etype == "PROJECT_RESUMED":
-            status["project"]["halted"] = False
-            status["project"]["phase"] = "running"
-            locks_project_running = True
+            self.project["halted"] = False
+            self.project["phase"] = "running"
+            self.locks_project_running = True
         elif etype == "PROJECT_MODE_RESTORED":
-            status["project"]["mode"] = "normal"
-            status["project"]["degradedReason"] = None
+            self.project["mode"] = "normal"
+            self.project["degradedReason"] = None
         elif etype in ("WATCHDOG_UNRESPONSIVE", "VERDICT_TIMEOUT", "RECOVERY_STARTED"):
-            status["project"]["mode"] = "degraded"
+            self.project["mode"] = "degraded"
             reason = {
                 "WATCHDOG_UNRESPONSIVE": "watchdog_unresponsive",
                 "VERDICT_TIMEOUT": "verdict_timeout",
                 "RECOVERY_STARTED": "recovery_in_progress",
             }.get(etype)
-            status["project"]["degradedReason"] = reason
+            self.project["degradedReason"] = reason
 
         if etype == "WATCHDOG_HEARTBEAT":
-            status["watchdog"]["lastHeartbeatAt"] = event.get("at")
-            status["watchdog"]["state"] = "healthy"
+            self.watchdog["lastHeartbeatAt"] = event.get("at")
+            self.watchdog["state"] = "healthy"
         elif etype == "WATCHDOG_UNRESPONSIVE":
-            status["watchdog"]["state"] = "unresponsive"
+            self.watchdog["state"] = "unresponsive"
 
         # Telemetry events
         if etype in ("MESSAGE_IGNORED", "WATCHDOG_UNRESPONSIVE", "VERDICT_TIMEOUT", "LOCK_TIMEOUT_DETECTED", "CORRUPTED_LINE_DETECTED"):
-            status["risks"].append({"type": etype, "eventId": event.get("eventId"), "payload": payload})
+            self.risks.append({"type": etype, "eventId": event.get("eventId"), "payload": payload})
 
         if not task_id:
-            continue
+            return
 
-        task = get_task(task_id)
-        run_bound_types = {
-            "WORKER_RUN_STARTED",
-            "WORKER_RUN_COMPLETED",
-            "WORKER_RUN_FAILED",
-            "WORKER_RUN_ABORTED",
-            "EVIDENCE_SUBMITTED",
-            "WATCHDOG_VERDICT",
-            "HUMAN_VERDICT",
-        }
-        if etype in run_bound_types and task.run_id and run_id and run_id != task.run_id:
-            continue
+        task = self.get_task(task_id)
+        if etype in self.RUN_BOUND_TYPES and task.run_id and run_id and run_id != task.run_id:
+            return
         if etype == "TASKSPEC_PUBLISHED":
             specs = payload.get("tasks") or []
             if specs:
                 for spec in specs:
                     tid = spec.get("taskId") or task_id
-                    t = get_task(tid)
+                    t = self.get_task(tid)
                     t.state = "pending"
                     apply_gate(t, "awaiting_skill_decision", True)
                     t.task_spec = spec
@@ -241,6 +310,10 @@ def reduce_events(base_dir: Path, emit_derived: bool = True) -> ReplayResult:
         elif etype == "TASK_SKILL_SET":
             apply_gate(task, "awaiting_skill_decision", False)
             task.skill_decision = {"chosenSkill": payload.get("chosenSkill"), "decisionSeq": payload.get("decisionSeq")}
+            try:
+                task.latest_skill_decision_seq = max(task.latest_skill_decision_seq, int(payload.get("decisionSeq") or 0))
+            except (TypeError, ValueError):
+                pass
         elif etype == "POLICY_TIER_REQUESTED":
             apply_gate(task, "awaiting_policy_approval", True)
         elif etype == "POLICY_TIER_APPROVED":
@@ -256,7 +329,7 @@ def reduce_events(base_dir: Path, emit_derived: bool = True) -> ReplayResult:
                 task.result = {}
             task.state = "assigned"
             task.run_id = run_id
-            open_runs.setdefault(task_id, []).append(run_id)
+            self.open_runs.setdefault(task_id, []).append(run_id)
         elif etype == "WORKER_RUN_STARTED":
             task.state = "running"
             task.run_id = run_id
@@ -289,7 +362,7 @@ def reduce_events(base_dir: Path, emit_derived: bool = True) -> ReplayResult:
             elif verdict == "BLOCK":
                 task.state = "blocked"
                 task.gates.clear()
-                status["alerts"].append({"type": "blocked", "taskId": task_id, "runId": run_id})
+                self.alerts.append({"type": "blocked", "taskId": task_id, "runId": run_id})
             recompute_state(task)
         elif etype == "HUMAN_VERDICT":
             verdict = payload.get("verdict")
@@ -304,70 +377,113 @@ def reduce_events(base_dir: Path, emit_derived: bool = True) -> ReplayResult:
             recompute_state(task)
         elif etype == "RUN_CLOSED":
             # release lock for this run
-            if task_id in open_runs and run_id in open_runs[task_id]:
-                open_runs[task_id] = [r for r in open_runs[task_id] if r != run_id]
-                if not open_runs[task_id]:
-                    open_runs.pop(task_id, None)
-
-    if status["project"]["degradedReason"] == "watchdog_unresponsive":
-        for task in tasks.values():
-            if task.state in ("done", "blocked", "canceled"):
-                continue
-            if "awaiting_verdict" in task.gates:
-                apply_gate(task, "needs_human_review", True)
+            if task_id in self.open_runs and run_id in self.open_runs[task_id]:
+                self.open_runs[task_id] = [r for r in self.open_runs[task_id] if r != run_id]
+                if not self.open_runs[task_id]:
+                    self.open_runs.pop(task_id, None)
+
+    def finalize(self) -> dict:
+        status = build_base_status(self.project_name or "unknown")
+        status["project"].update({k: v for k, v in self.project.items()})
+        status["watchdog"] = dict(self.watchdog)
+        status["risks"] = list(self.risks)
+        status["alerts"] = list(self.alerts)
+
+        degraded_unresponsive = status["project"]["degradedReason"] == "watchdog_unresponsive"
+
+        # derive locks
+        status["locks"]["project"] = "running" if self.locks_project_running and not status["project"]["halted"] else "idle"
+
+        locks_tasks = {}
+        for task_id, run_ids in self.open_runs.items():
+            if len(run_ids) == 1:
+                locks_tasks[task_id] = run_ids[0]
+            else:
+                status["project"]["mode"] = "degraded"
+                status["project"]["degradedReason"] = "multiple_open_runs"
+                status["alerts"].append({"type": "multiple_open_runs", "taskId": task_id, "runIds": run_ids})
+        status["locks"]["tasks"] = locks_tasks
+
+        # finalize tasks list + progress
+        tasks_out = []
+        done_count = 0
+        blocked_count = 0
+        running_count = 0
+        for task in self.tasks.values():
+            if task.state == "running":
+                running_count += 1
+            if task.state == "done":
+                done_count += 1
+                tasks_out.append({
+                    "taskId": task.task_id,
+                    "resultSummary": task.result.get("summary"),
+                    "evidencePath": task.last_evidence.get("evidencePath"),
+                    "lastRunId": task.run_id,
+                    "taskSpec": task.task_spec or None,
+                })
+            else:
+                if task.state == "blocked":
+                    blocked_count += 1
+                gates = set(task.gates)
+                if (
+                    degraded_unresponsive
+                    and task.state not in ("done", "blocked", "canceled")
+                    and "awaiting_verdict" in gates
+                ):
+                    gates.add("needs_human_review")
+                tasks_out.append({
+                    "taskId": task.task_id,
+                    "state": task.state,
+                    "gates": sorted(gates),
+                    "runId": task.run_id,
+                    "skillDecision": task.skill_decision,
+                    "latestSkillDecisionSeq": task.latest_skill_decision_seq,
+                    "policyTier": task.policy_tier,
+                    "lastEvidence": task.last_evidence,
+                    "lastVerdict": task.last_verdict,
+                    "result": task.result,
+                    "taskSpec": task.task_spec or None,
+                })
 
-    # derive locks
-    status["locks"]["project"] = "running" if locks_project_running and not status["project"]["halted"] else "idle"
-
-    locks_tasks = {}
-    for task_id, run_ids in open_runs.items():
-        if len(run_ids) == 1:
-            locks_tasks[task_id] = run_ids[0]
-        else:
-            status["project"]["mode"] = "degraded"
-            status["project"]["degradedReason"] = "multiple_open_runs"
-            status["alerts"].append({"type": "multiple_open_runs", "taskId": task_id, "runIds": run_ids})
-    status["locks"]["tasks"] = locks_tasks
-
-    # finalize tasks list + progress
-    tasks_out = []
-    done_count = 0
-    blocked_count = 0
-    for task in tasks.values():
-        if task.state == "done":
-            done_count += 1
-            tasks_out.append({
-                "taskId": task.task_id,
-                "resultSummary": task.result.get("summary"),
-                "evidencePath": task.last_evidence.get("evidencePath"),
-                "lastRunId": task.run_id,
-                "taskSpec": task.task_spec or None,
-            })
-        else:
-            if task.state == "blocked":
-                blocked_count += 1
-            tasks_out.append({
-                "taskId": task.task_id,
-                "state": task.state,
-                "gates": sorted(list(task.gates)),
-                "runId": task.run_id,
-                "skillDecision": task.skill_decision,
-                "policyTier": task.policy_tier,
-                "lastEvidence": task.last_evidence,
-                "lastVerdict": task.last_verdict,
-                "result": task.result,
-                "taskSpec": task.task_spec or None,
-            })
+        status["tasks"] = tasks_out
+        status["tasksById"] = {t["taskId"]: t for t in tasks_out}
+        status["project"]["progress"] = {
+            "total": len(tasks_out),
+            "done": done_count,
+            "blocked": blocked_count,
+        }
+        status["project"]["runningCount"] = running_count
+        status["updatedAt"] = utc_now()
+        return status
 
-    status["tasks"] = tasks_out
-    status["project"]["progress"] = {
-        "total": len(tasks_out),
-        "done": done_count,
-        "blocked": blocked_count,
-    }
-    status["updatedAt"] = utc_now()
 
-    # Write derived outputs
+def write_derived(derived_dir: Path, verdict_events: List[dict], status: dict):
+    derived_dir.mkdir(parents=True, exist_ok=True)
+    # derived verdicts
+    verdicts_path = derived_dir / "watchdog-verdicts.ndjson"
+    with open(verdicts_path, "wb") as f:
+        for ev in verdict_events:
+            f.write(jsonx.dumps(ev) + b"\n")
+    # locks index
+    locks_index_path = derived_dir / "locks-index.json"
+    atomic_write_json(locks_index_path, status["locks"])
+
+
+def reduce_events(base_dir: Path, emit_derived: bool = True) -> ReplayResult:
+    base_dir = Path(base_dir)
+    audit_dir = base_dir / "audit"
+    derived_dir = base_dir / "derived"
+    events_path = audit_dir / "events.ndjson"
+
+    events, corrupted = read_events(events_path)
+    # sort by sequenceNumber (fallback to 0); skipped when already ordered
+    sort_events(events)
+
+    reducer = StatusReducer()
+    for event in events:
+        reducer.fold(event)
+    status = reducer.finalize()
+
     alerts = []
     if corrupted:
         for c in corrupted:
@@ -380,15 +496,6 @@ def reduce_events(base_dir: Path, emit_derived: bool = True) -> ReplayResult:
         status["alerts"].extend(alerts)
 
     if emit_derived:
-        derived_dir.mkdir(parents=True, exist_ok=True)
-        # derived verdicts
-        verdicts_path = derived_dir / "watchdog-verdicts.ndjson"
-        with open(verdicts_path, "w", encoding="utf-8") as f:
-            for ev in events:
-                if ev.get("type") == "WATCHDOG_VERDICT":
-                    f.write(json.dumps(ev, ensure_ascii=False, separators=(",", ":")) + "\n")
-        # locks index
-        locks_index_path = derived_dir / "locks-index.json"
-        atomic_write_json(locks_index_path, status["locks"])
+        write_derived(derived_dir, reducer.verdict_events, status)
 
     return ReplayResult(status=status, corrupted_lines=corrupted, alerts=alerts)
@@ -1,19 +1,25 @@
 import json
 import os
+import threading
 import time
 import uuid
 import hashlib
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 import fcntl
 
+from . import jsonx
 from .protocol import compute_crc32, verify_crc32
 
 
 ISO_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
 
+# synchronous-write flag for the audit fd; 0 on platforms without O_DSYNC,
+# in which case an explicit fsync after each write takes over
+O_DSYNC = getattr(os, "O_DSYNC", 0)
+
 
 class LockTimeout(Exception):
     def __init__(self, path: Path, timeout: float, holder: Optional[dict] = None):
@@ -100,8 +106,8 @@ def sha256_hex(s: str) -> str:
 def atomic_write_json(path: Path, data: dict):
     path.parent.mkdir(parents=True, exist_ok=True)
     tmp_path = path.with_suffix(path.suffix + ".tmp")
-    with open(tmp_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    with open(tmp_path, "wb") as f:
+        f.write(jsonx.dumps_pretty(data))
         f.flush()
         os.fsync(f.fileno())
     os.replace(tmp_path, path)
@@ -118,23 +124,64 @@ class StateManager:
         self.id_index_path = self.derived_dir / "idempotency-index.json"
         self.security_log = self.audit_dir / "security.log"
         self.lock_timeout = lock_timeout
+        # in-memory copy of the idempotency index, validated by file identity
+        self._id_index_cache: Optional[Tuple[tuple, Dict[str, int]]] = None
+        # lazily opened raw fd for audit appends
+        self._audit_fd: Optional[int] = None
+        self._audit_fd_lock = threading.Lock()
 
     def _ensure_dirs(self):
         self.audit_dir.mkdir(parents=True, exist_ok=True)
         self.derived_dir.mkdir(parents=True, exist_ok=True)
 
+    def _audit_write(self, buf: bytes):
+        """Append pre-serialized bytes to the audit log via a raw fd.
+
+        O_APPEND keeps each os.write atomic at the end of the file, and the
+        fd is opened once per StateManager instead of per append. O_DSYNC
+        makes each write land synchronously without the separate fsync and
+        its extra metadata flush; the fsync fallback covers platforms that
+        lack the flag.
+        """
+        with self._audit_fd_lock:
+            if self._audit_fd is None:
+                self.events_path.parent.mkdir(parents=True, exist_ok=True)
+                self._audit_fd = os.open(
+                    str(self.events_path),
+                    os.O_WRONLY | os.O_APPEND | os.O_CREAT | O_DSYNC,
+                    0o644,
+                )
+            os.write(self._audit_fd, buf)
+            if not O_DSYNC:
+                os.fsync(self._audit_fd)
+
+    def _index_stat_key(self) -> Optional[tuple]:
+        try:
+            st = self.id_index_path.stat()
+            return (st.st_mtime_ns, st.st_size, st.st_ino)
+        except OSError:
+            return None
+
     def _load_idempotency_index(self) -> Dict[str, int]:
-        if not self.id_index_path.exists():
+        stat_key = self._index_stat_key()
+        if stat_key is None:
             return {}
+        cached = self._id_index_cache
+        if cached is not None and cached[0] == stat_key:
+            return cached[1]
         try:
             with open(self.id_index_path, "r", encoding="utf-8") as f:
                 data = json.load(f)
-                return data.get("keys", {})
+                keys = data.get("keys", {})
         except Exception:
             return {}
+        self._id_index_cache = (stat_key, keys)
+        return keys
 
     def _save_idempotency_index(self, keys: Dict[str, int]):
         atomic_write_json(self.id_index_path, {"keys": keys})
+        stat_key = self._index_stat_key()
+        self._id_index_cache = (stat_key, keys) if stat_key is not None else None
 
     def _read_last_sequence(self) -> int:
         if self.sequence_path.exists():
@@ -201,12 +248,7 @@ class StateManager:
 
                 event["crc32"] = compute_crc32(event)
 
-                line = json.dumps(event, ensure_ascii=False, separators=(",", ":"))
-                self.events_path.parent.mkdir(parents=True, exist_ok=True)
-                with open(self.events_path, "a", encoding="utf-8") as f:
-                    f.write(line + "\n")
-                    f.flush()
-                    os.fsync(f.fileno())
+                self._audit_write(jsonx.dumps(event) + b"\n")
 
                 keys[key] = seq
                 self._save_idempotency_index(keys)
@@ -222,6 +264,60 @@ class StateManager:
             })
             raise
 
+    def append_events(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Append a batch of events under one lock with a single write+fsync.
+
+        Deduped entries are skipped; appended events get consecutive sequence
+        numbers, and the idempotency index and sequence counter are persisted
+        once for the whole batch. Returns one result dict per input event.
+        """
+        self._ensure_dirs()
+        for event in events:
+            if "idempotencyKey" not in event:
+                raise ValueError("idempotencyKey is required")
+
+        lock = FileLock(self.events_path.with_suffix(self.events_path.suffix + ".lock"), timeout=self.lock_timeout)
+        try:
+            with lock:
+                keys = self._load_idempotency_index()
+                seq = self._read_last_sequence()
+                results = []
+                lines = []
+                for event in events:
+                    key = event["idempotencyKey"]
+                    if key in keys:
+                        results.append({"status": "deduped", "event": None})
+                        continue
+
+                    seq += 1
+                    event = {**event}
+                    event.setdefault("eventId", f"e-{uuid.uuid4().hex}")
+                    event.setdefault("schemaVersion", 1)
+                    event.setdefault("sequenceNumber", seq)
+                    event.setdefault("at", utc_now())
+
+                    event["crc32"] = compute_crc32(event)
+
+                    lines.append(jsonx.dumps(event))
+                    keys[key] = seq
+                    results.append({"status": "appended", "event": event})
+
+                if lines:
+                    self._audit_write(b"\n".join(lines) + b"\n")
+
+                    self._save_idempotency_index(keys)
+                    self._write_sequence(seq)
+                return results
+        except LockTimeout as e:
+            self._append_security_log({
+                "type": "LOCK_TIMEOUT_DETECTED",
+                "path": str(self.events_path),
+                "timeout": self.lock_timeout,
+                "holder": e.holder,
+                "at": utc_now(),
+            })
+            raise
+
     def write_status(self, status: Dict[str, Any]):
         self._ensure_dirs()
         lock = FileLock(self.status_path.with_suffix(self.status_path.suffix + ".lock"), timeout=self.lock_timeout)
@@ -240,9 +336,9 @@ class StateManager:
 
     def _append_security_log(self, entry: Dict[str, Any]):
         self.audit_dir.mkdir(parents=True, exist_ok=True)
-        line = json.dumps(entry, ensure_ascii=False)
-        with open(self.security_log, "a", encoding="utf-8") as f:
-            f.write(line + "\n")
+        buf = jsonx.dumps(entry) + b"\n"
+        with open(self.security_log, "ab") as f:
+            f.write(buf)
             f.flush()
             os.fsync(f.fileno())
 
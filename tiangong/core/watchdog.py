@@ -3,7 +3,7 @@ Watchdog 模块：Evidence 校验与裁决建议
 """
 import json
 import hashlib
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
@@ -126,7 +126,6 @@ class Watchdog:
         
         # 1. 检查 required fields（使用 dataclass 的 __dataclass_fields__）
         missing_fields = []
-        from dataclasses import fields
         for field in fields(evidence):
             if field.name in self.required_fields:
                 value = getattr(evidence, field.name)
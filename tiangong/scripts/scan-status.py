@@ -1,8 +1,15 @@
 import json
 import os
 import re
+import string
+import tempfile
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # 配置
 PROJECT_ROOT = "/Users/xiaokai/clawd/miniexplorer"
 PLAN_FILE = f"{PROJECT_ROOT}/docs/plans/ios-app-implementation-ai-plan.md"
@@ -19,10 +26,35 @@ TASKS = [
     {"id": "P2.1", "desc": "Coze Bridge", "check": "ios/MiniExplorer/Resources/coze-bridge.html"},
 ]
 
+def _atomic_write(path, data: bytes):
+    """单次写入临时文件后 os.replace，避免 dashboard 自刷新时读到半截文件"""
+    tmp = tempfile.NamedTemporaryFile(dir=os.path.dirname(path), delete=False)
+    try:
+        tmp.write(data)
+        tmp.close()
+        os.replace(tmp.name, path)
+    except BaseException:
+        tmp.close()
+        os.unlink(tmp.name)
+        raise
+
+
+def _dump_json(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
 def check_file(path):
     full_path = os.path.join(PROJECT_ROOT, path)
     return os.path.exists(full_path)
 
+# 规范化 check 列表一次，避免每次刷新重复 isinstance 分支
+_TASK_CHECKS = [
+    (task, [task["check"]] if isinstance(task["check"], str) else task["check"])
+    for task in TASKS
+]
+
 def scan_status():
     status_data = {
         "project": "MiniExplorer",
@@ -31,15 +63,11 @@ def scan_status():
         "phase": "Phase 5",
         "progress": 0
     }
-    
+
     done_count = 0
     total_count = 0
-    
-    for task in TASKS:
-        checks = task["check"]
-        if isinstance(checks, str):
-            checks = [checks]
-            
+
+    for task, checks in _TASK_CHECKS:
         all_passed = all(check_file(f) for f in checks)
         state = "done" if all_passed else "pending"
         
@@ -59,44 +87,48 @@ def scan_status():
         
     return status_data
 
-def generate_html(data):
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <title>{data['project']} Dashboard</title>
+# 静态 CSS/脚本在 import 时编码一次；progress 宽度移到内联 style 保持这里不变
+_STATIC_HEAD_BYTES = """
         <style>
-            body {{ font-family: -apple-system, sans-serif; padding: 20px; background: #f5f5f7; }}
-            .card {{ background: white; border-radius: 12px; padding: 20px; margin-bottom: 20px; box-shadow: 0 2px 10px rgba(0,0,0,0.05); }}
-            h1 {{ margin: 0 0 10px; font-size: 24px; }}
-            .meta {{ color: #888; font-size: 14px; margin-bottom: 20px; }}
-            .progress-bar {{ background: #eee; height: 10px; border-radius: 5px; overflow: hidden; }}
-            .progress-fill {{ background: #007aff; height: 100%; width: {data['progress']}%; transition: width 0.3s; }}
-            .task-list {{ list-style: none; padding: 0; }}
-            .task-item {{ padding: 12px 0; border-bottom: 1px solid #eee; display: flex; justify-content: space-between; align-items: center; }}
-            .task-id {{ font-weight: bold; width: 60px; color: #555; }}
-            .task-desc {{ flex: 1; }}
-            .status-badge {{ padding: 4px 8px; border-radius: 4px; font-size: 12px; font-weight: bold; }}
-            .status-done {{ background: #e5f9e7; color: #2ecc71; }}
-            .status-pending {{ background: #fff5e6; color: #f39c12; }}
-            .agent-status {{ display: flex; gap: 10px; margin-top: 10px; }}
-            .agent {{ background: #f0f0f5; padding: 8px 12px; border-radius: 8px; font-size: 13px; }}
+            body { font-family: -apple-system, sans-serif; padding: 20px; background: #f5f5f7; }
+            .card { background: white; border-radius: 12px; padding: 20px; margin-bottom: 20px; box-shadow: 0 2px 10px rgba(0,0,0,0.05); }
+            h1 { margin: 0 0 10px; font-size: 24px; }
+            .meta { color: #888; font-size: 14px; margin-bottom: 20px; }
+            .progress-bar { background: #eee; height: 10px; border-radius: 5px; overflow: hidden; }
+            .progress-fill { background: #007aff; height: 100%; transition: width 0.3s; }
+            .task-list { list-style: none; padding: 0; }
+            .task-item { padding: 12px 0; border-bottom: 1px solid #eee; display: flex; justify-content: space-between; align-items: center; }
+            .task-id { font-weight: bold; width: 60px; color: #555; }
+            .task-desc { flex: 1; }
+            .status-badge { padding: 4px 8px; border-radius: 4px; font-size: 12px; font-weight: bold; }
+            .status-done { background: #e5f9e7; color: #2ecc71; }
+            .status-pending { background: #fff5e6; color: #f39c12; }
+            .agent-status { display: flex; gap: 10px; margin-top: 10px; }
+            .agent { background: #f0f0f5; padding: 8px 12px; border-radius: 8px; font-size: 13px; }
         </style>
         <script>
             setTimeout(() => window.location.reload(), 10000); // Auto refresh
         </script>
     </head>
-    <body>
+""".encode("utf-8")
+
+_TITLE_TMPL = string.Template("""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="utf-8">
+        <title>$project Dashboard</title>""")
+
+_BODY_TMPL = string.Template("""    <body>
         <div class="card">
-            <h1>📱 {data['project']}</h1>
-            <div class="meta">Last updated: {data['lastUpdated']}</div>
-            
-            <h3>Phase 5 Progress: {data['progress']}%</h3>
+            <h1>📱 $project</h1>
+            <div class="meta">Last updated: $lastUpdated</div>
+
+            <h3>Phase 5 Progress: $progress%</h3>
             <div class="progress-bar">
-                <div class="progress-fill"></div>
+                <div class="progress-fill" style="width: $progress%"></div>
             </div>
-            
+
             <div class="agent-status">
                 <div class="agent">🤖 PM: Active</div>
                 <div class="agent">👷 Worker: Standby</div>
@@ -107,38 +139,53 @@ def generate_html(data):
         <div class="card">
             <h3>Tasks</h3>
             <ul class="task-list">
-    """
-    
+""")
+
+_FOOTER_BYTES = b"""
+            </ul>
+        </div>
+    </body>
+    </html>
+"""
+
+
+def generate_html(data) -> bytes:
+    title = _TITLE_TMPL.substitute(project=data["project"])
+    body = _BODY_TMPL.substitute(
+        project=data["project"],
+        lastUpdated=data["lastUpdated"],
+        progress=data["progress"],
+    )
+
+    items = []
     for task in data["tasks"]:
         status_class = f"status-{task['state']}"
         icon = "✅" if task['state'] == "done" else "⏳"
-        html += f"""
+        items.append(f"""
             <li class="task-item">
                 <span class="task-id">{task['id']}</span>
                 <span class="task-desc">{task['desc']}</span>
                 <span class="status-badge {status_class}">{icon} {task['state'].upper()}</span>
             </li>
-        """
-        
-    html += """
-            </ul>
-        </div>
-    </body>
-    </html>
-    """
-    return html
+        """)
+
+    return b"".join([
+        title.encode("utf-8"),
+        _STATIC_HEAD_BYTES,
+        body.encode("utf-8"),
+        "".join(items).encode("utf-8"),
+        _FOOTER_BYTES,
+    ])
 
 # 执行
 data = scan_status()
 
 # 写入 JSON
 os.makedirs(os.path.dirname(OUTPUT_JSON), exist_ok=True)
-with open(OUTPUT_JSON, "w") as f:
-    json.dump(data, f, indent=2)
+_atomic_write(OUTPUT_JSON, _dump_json(data))
 
 # 写入 HTML
 os.makedirs(os.path.dirname(OUTPUT_HTML), exist_ok=True)
-with open(OUTPUT_HTML, "w") as f:
-    f.write(generate_html(data))
+_atomic_write(OUTPUT_HTML, generate_html(data))
 
 print(f"Dashboard generated: {OUTPUT_HTML}")
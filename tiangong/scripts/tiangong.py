@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import argparse
 import json
+import os
 import sys
 from pathlib import Path
 from types import SimpleNamespace
@@ -9,13 +10,7 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 TOOL_ROOT = SCRIPT_DIR.parent
 sys.path.insert(0, str(TOOL_ROOT))
 
-from core.state_manager import StateManager
-from core.reducer import reduce_events, read_events
-from core.orchestrator import Orchestrator, OrchestratorConfig
-from core.ids import run_id
-from core.openclaw_client import OpenClawClient
-from core.skill_registry import SkillRegistry
-from core.skill_router import SkillRouter
+# core 模块按需在各命令内部导入，降低 list/--help 等轻命令的冷启动开销
 
 
 def projects_root() -> Path:
@@ -31,23 +26,167 @@ def tiangong_dir(name: str) -> Path:
 
 
 def load_events_sorted(base_dir: Path):
+    from core.reducer import read_events, sort_events
+
     events, corrupted = read_events(base_dir / "audit" / "events.ndjson")
-    events.sort(key=lambda e: (int(e.get("sequenceNumber", 0)), e.get("eventId", "")))
+    sort_events(events)
     return events, corrupted
 
 
+# 同一次 CLI 调用内按 (mtime, size, inode) 复用已归约的 status，避免重复全量回放
+_STATUS_CACHE = {}
+
+
+def _events_stat_key(base_dir: Path):
+    try:
+        st = (base_dir / "audit" / "events.ndjson").stat()
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    except OSError:
+        return None
+
+
+def _invalidate_status(base_dir: Path):
+    _STATUS_CACHE.pop(Path(base_dir), None)
+
+
 def load_status(base_dir: Path):
-    return reduce_events(base_dir).status
+    from core.reducer import reduce_events
+
+    base_dir = Path(base_dir)
+    key = _events_stat_key(base_dir)
+    cached = _STATUS_CACHE.get(base_dir)
+    if cached is not None and key is not None and cached[0] == key:
+        return cached[1]
+    status = reduce_events(base_dir).status
+    if key is not None:
+        _STATUS_CACHE[base_dir] = (key, status)
+    return status
+
+
+def _find_last_event(events_path: Path, needles, match):
+    """从文件尾部按块反向扫描，找到最后一条满足 match 的事件。
+
+    目标事件通常在日志末尾，避免为此全量解析整个 audit log；
+    只有同时包含全部 needles 字节串的行才会被 JSON 解析，
+    且 CRC 校验不通过的行与 reducer 一样按损坏行跳过。
+    """
+    from core import jsonx
+    from core.protocol import verify_crc32
+
+    try:
+        size = events_path.stat().st_size
+    except OSError:
+        return None
+    with open(events_path, "rb") as f:
+        pos = size
+        buf = b""
+        while pos > 0:
+            step = min(1 << 16, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+            lines = buf.split(b"\n")
+            if pos > 0:
+                buf = lines[0]  # 行首可能被块边界截断，并入下一块再处理
+                lines = lines[1:]
+            for line in reversed(lines):
+                if not all(needle in line for needle in needles):
+                    continue
+                try:
+                    ev = jsonx.loads(line)
+                except Exception:
+                    continue
+                if verify_crc32(ev) and match(ev):
+                    return ev
+    return None
+
+
+def _find_last_event_by_type(events_path: Path, type_name: str):
+    needles = (type_name.encode("utf-8"),)
+    return _find_last_event(events_path, needles, lambda ev: ev.get("type") == type_name)
+
+
+def _get_active_run_id(base_dir: Path, task_id: str):
+    """取该任务最近一次 WORKER_RUN_INTENT 的 runId，等价于 status 中的 task.runId"""
+    events_path = base_dir / "audit" / "events.ndjson"
+    needles = (b"WORKER_RUN_INTENT", task_id.encode("utf-8"))
+    ev = _find_last_event(
+        events_path,
+        needles,
+        lambda ev: ev.get("type") == "WORKER_RUN_INTENT" and ev.get("taskId") == task_id,
+    )
+    return ev.get("runId") if ev else None
+
+
+# registry.json / team.json 很少变化；按 (mtime, size) 记忆化解析结果
+_FILE_CACHE = {}
+
+
+def _cached_file(path: Path, loader):
+    try:
+        st = path.stat()
+    except OSError:
+        return loader(path)
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _FILE_CACHE.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    value = loader(path)
+    _FILE_CACHE[path] = (key, value)
+    return value
+
+
+def _cached_registry(base_dir: Path):
+    from core.skill_registry import SkillRegistry
+
+    return _cached_file(base_dir / "registry.json", SkillRegistry.load)
+
+
+def _cached_team(base_dir: Path) -> dict:
+    from core import jsonx
+
+    return _cached_file(base_dir / "team.json", lambda p: jsonx.loads(p.read_bytes()))
+
+
+# 同一次 CLI 调用内复用 StateManager，避免重复初始化目录与索引
+_SM_CACHE = {}
+
+
+def _sm(base_dir: Path):
+    from core.state_manager import StateManager
+
+    base_dir = Path(base_dir)
+    sm = _SM_CACHE.get(base_dir)
+    if sm is None:
+        sm = _SM_CACHE[base_dir] = StateManager(base_dir)
+    return sm
+
+
+def _orchestrator(base_dir: Path):
+    from core.orchestrator import Orchestrator, OrchestratorConfig
+
+    return Orchestrator(OrchestratorConfig(base_dir=base_dir))
+
+
+def _pprint(obj):
+    """大块 JSON 用 jsonx（orjson 可用时走 C 编码）整体输出，避免逐元素缩进开销"""
+    from core import jsonx
+
+    sys.stdout.buffer.write(jsonx.dumps_pretty(obj) + b"\n")
+    sys.stdout.buffer.flush()
 
 
 def cmd_list(_args):
     root = projects_root()
-    if not root.exists():
+    # scandir 的目录项自带 is_dir，免去 iterdir + 逐项 stat
+    try:
+        with os.scandir(root) as entries:
+            names = sorted(e.name for e in entries if e.is_dir(follow_symlinks=False))
+    except FileNotFoundError:
         print("No projects directory.")
         return 1
-    for p in sorted(root.iterdir()):
-        if p.is_dir():
-            print(p.name)
+    if names:
+        sys.stdout.write("\n".join(names) + "\n")
     return 0
 
 
@@ -57,7 +196,8 @@ def cmd_create(args):
         print("ERROR: start-project.sh not found.")
         return 1
     plan = args.plan or ""
-    rc = __import__("subprocess").run([str(script), args.project, args.root, plan]).returncode
+    import subprocess
+    rc = subprocess.run([str(script), args.project, args.root, plan]).returncode
     if rc != 0:
         return rc
     if args.no_spawn:
@@ -70,7 +210,7 @@ def cmd_create(args):
 def cmd_status(args):
     base_dir = tiangong_dir(args.project)
     status = load_status(base_dir)
-    print(json.dumps(status, ensure_ascii=False, indent=2))
+    _pprint(status)
     return 0
 
 
@@ -96,11 +236,13 @@ def cmd_risks(args):
         "risks": status.get("risks", []),
         "alerts": status.get("alerts", []),
     }
-    print(json.dumps(payload, ensure_ascii=False, indent=2))
+    _pprint(payload)
     return 0
 
 
 def cmd_suggest_skill(args):
+    from core.skill_router import SkillRouter
+
     base_dir = tiangong_dir(args.project)
     status = load_status(base_dir)
     task = _get_task(status, args.task_id)
@@ -113,12 +255,12 @@ def cmd_suggest_skill(args):
         task_spec["suggestedSkills"] = merged
     task_spec.setdefault("taskId", args.task_id)
 
-    registry = SkillRegistry.load(base_dir / "registry.json")
+    registry = _cached_registry(base_dir)
     team_path = base_dir / "team.json"
     memory = {}
     if team_path.exists():
         try:
-            data = json.loads(team_path.read_text(encoding="utf-8"))
+            data = _cached_team(base_dir)
             memory = data.get("defaults", {}).get("skillMemory", {})
         except Exception:
             memory = {}
@@ -127,13 +269,15 @@ def cmd_suggest_skill(args):
     suggestion = router.suggest(task_spec)
 
     if args.json:
-        print(json.dumps(suggestion.to_dict(), ensure_ascii=False, indent=2))
+        _pprint(suggestion.to_dict())
     else:
         print(router.build_prompt(args.project, suggestion))
     return 0
 
 
 def cmd_start(args):
+    from core.ids import run_id
+
     base_dir = tiangong_dir(args.project)
     status = load_status(base_dir)
     proj = status.get("project", {})
@@ -152,9 +296,10 @@ def cmd_start(args):
         "payload": {},
         "idempotencyKey": f"{args.project}:PROJECT_STARTED:{start_id}",
     }
-    sm = StateManager(base_dir)
+    sm = _sm(base_dir)
     sm.append_event(event)
-    orch = Orchestrator(OrchestratorConfig(base_dir=base_dir))
+    _invalidate_status(base_dir)
+    orch = _orchestrator(base_dir)
     result = orch.tick()
     prompts = orch.suggest_skills(result.status)
     for prompt in prompts:
@@ -170,12 +315,7 @@ def cmd_resume(args):
     if not proj.get("halted"):
         print("Project not halted.")
         return 0
-    events, _ = load_events_sorted(base_dir)
-    last_halt = None
-    for ev in reversed(events):
-        if ev.get("type") == "PROJECT_HALTED":
-            last_halt = ev
-            break
+    last_halt = _find_last_event_by_type(base_dir / "audit" / "events.ndjson", "PROJECT_HALTED")
     halt_event_id = last_halt.get("eventId") if last_halt else "unknown"
     event = {
         "type": "PROJECT_RESUMED",
@@ -188,28 +328,59 @@ def cmd_resume(args):
         },
         "idempotencyKey": f"{args.project}:PROJECT_RESUMED:{halt_event_id}",
     }
-    sm = StateManager(base_dir)
+    sm = _sm(base_dir)
     sm.append_event(event)
-    Orchestrator(OrchestratorConfig(base_dir=base_dir)).tick()
+    _invalidate_status(base_dir)
+    _orchestrator(base_dir).tick()
     print(f"Resumed project {args.project}")
     return 0
 
 
 def _get_task(status: dict, task_id: str) -> dict:
+    # 归约时已建好 taskId 索引；旧快照缺字段时退回线性查找
+    by_id = status.get("tasksById")
+    if by_id is not None:
+        return by_id.get(task_id) or {}
     for t in status.get("tasks", []):
         if t.get("taskId") == task_id:
             return t
     return {}
 
 
+def _max_skill_decision_seq(events_path: Path, task_id: str) -> int:
+    """兜底路径：按字节过滤后只解析相关行，取该任务的最大 decisionSeq"""
+    from core import jsonx
+
+    try:
+        data = events_path.read_bytes()
+    except FileNotFoundError:
+        return 0
+    type_needle = b"TASK_SKILL_SET"
+    task_needle = task_id.encode("utf-8")
+    latest = 0
+    for line in data.splitlines():
+        if type_needle not in line or task_needle not in line:
+            continue
+        try:
+            ev = jsonx.loads(line)
+        except Exception:
+            continue
+        if ev.get("type") == "TASK_SKILL_SET" and ev.get("taskId") == task_id:
+            latest = max(latest, int(ev.get("payload", {}).get("decisionSeq", 0)))
+    return latest
+
+
 def cmd_choose_skill(args):
+    from core.skill_router import SkillRouter
+
     base_dir = tiangong_dir(args.project)
     status = load_status(base_dir)
-    events, _ = load_events_sorted(base_dir)
-    decision_seq = 1
-    for ev in events:
-        if ev.get("type") == "TASK_SKILL_SET" and ev.get("taskId") == args.task_id:
-            decision_seq = max(decision_seq, int(ev.get("payload", {}).get("decisionSeq", 0)) + 1)
+    # status 已随归约携带最新 decisionSeq；字段缺失（如已完成任务）时回退扫描日志
+    task = _get_task(status, args.task_id)
+    latest_seq = task.get("latestSkillDecisionSeq")
+    if latest_seq is None:
+        latest_seq = _max_skill_decision_seq(base_dir / "audit" / "events.ndjson", args.task_id)
+    decision_seq = int(latest_seq) + 1
     event = {
         "type": "TASK_SKILL_SET",
         "actor": "human",
@@ -218,10 +389,10 @@ def cmd_choose_skill(args):
         "payload": {"chosenSkill": args.skill, "decisionSeq": decision_seq},
         "idempotencyKey": f"{args.project}:{args.task_id}:TASK_SKILL_SET:{decision_seq}",
     }
-    sm = StateManager(base_dir)
+    sm = _sm(base_dir)
     sm.append_event(event)
 
-    registry = SkillRegistry.load(base_dir / "registry.json")
+    registry = _cached_registry(base_dir)
     spec = registry.get(args.skill)
     tier = None
     if spec and spec.riskPolicy:
@@ -240,8 +411,9 @@ def cmd_choose_skill(args):
             "idempotencyKey": f"{args.project}:{args.task_id}:POLICY_TIER_REQUESTED:{tier}",
         }
         sm.append_event(req_event)
+    _invalidate_status(base_dir)
 
-    orch = Orchestrator(OrchestratorConfig(base_dir=base_dir))
+    orch = _orchestrator(base_dir)
     orch.tick()
 
     status = load_status(base_dir)
@@ -257,9 +429,8 @@ def cmd_choose_skill(args):
 
 def cmd_approve_tier(args):
     base_dir = tiangong_dir(args.project)
-    status = load_status(base_dir)
-    task = _get_task(status, args.task_id)
-    run_id_val = task.get("runId")
+    # 只需要 runId，不必为此全量归约一次 status
+    run_id_val = _get_active_run_id(base_dir, args.task_id)
     event = {
         "type": "POLICY_TIER_APPROVED",
         "actor": "human",
@@ -271,18 +442,18 @@ def cmd_approve_tier(args):
     if run_id_val:
         event["runId"] = run_id_val
         event["idempotencyKey"] = f"{args.project}:{args.task_id}:{run_id_val}:POLICY_TIER_APPROVED:{args.tier}"
-    sm = StateManager(base_dir)
+    sm = _sm(base_dir)
     sm.append_event(event)
-    Orchestrator(OrchestratorConfig(base_dir=base_dir)).tick()
+    _invalidate_status(base_dir)
+    _orchestrator(base_dir).tick()
     print(f"Policy tier approved for {args.task_id}: {args.tier}")
     return 0
 
 
 def cmd_human_verdict(args):
     base_dir = tiangong_dir(args.project)
-    status = load_status(base_dir)
-    task = _get_task(status, args.task_id)
-    run_id_val = task.get("runId")
+    # 只需要 runId，不必为此全量归约一次 status
+    run_id_val = _get_active_run_id(base_dir, args.task_id)
     if not run_id_val:
         print("ERROR: task has no active runId.")
         return 1
@@ -301,16 +472,17 @@ def cmd_human_verdict(args):
         },
         "idempotencyKey": f"{args.project}:{args.task_id}:{run_id_val}:HUMAN_VERDICT:{verdict}",
     }
-    sm = StateManager(base_dir)
+    sm = _sm(base_dir)
     sm.append_event(event)
-    Orchestrator(OrchestratorConfig(base_dir=base_dir)).tick()
+    _invalidate_status(base_dir)
+    _orchestrator(base_dir).tick()
     print(f"Human verdict for {args.task_id}: {verdict}")
     return 0
 
 
 def cmd_tick(args):
     base_dir = tiangong_dir(args.project)
-    orch = Orchestrator(OrchestratorConfig(base_dir=base_dir))
+    orch = _orchestrator(base_dir)
     result = orch.tick()
     prompts = orch.suggest_skills(result.status)
     for prompt in prompts:
@@ -319,18 +491,35 @@ def cmd_tick(args):
     return 0
 
 
-def cmd_autopilot(args):
-    """自动运行：定期 tick 直到项目完成"""
+def _wait_for_events_change(base_dir: Path, timeout: float, poll_interval: float = 0.5):
+    """等待 events.ndjson 发生变化，最多等 timeout 秒。
+
+    inotify/watchfiles 属可选依赖，这里用短周期 stat 轮询实现同样的
+    "状态推进才 tick" 语义，保持零依赖；无变化时退化为原来的定时 tick。
+    """
     import time
+    deadline = time.monotonic() + timeout
+    start_key = _events_stat_key(base_dir)
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(poll_interval, remaining))
+        if _events_stat_key(base_dir) != start_key:
+            return True
+
+
+def cmd_autopilot(args):
+    """自动运行：事件推进或到达 interval 上限时 tick，直到项目完成"""
     base_dir = tiangong_dir(args.project)
     interval = args.interval  # 秒
     max_runs = args.max_runs
 
     print(f"Starting autopilot for {args.project} (interval={interval}s, max={max_runs})")
 
+    orch = _orchestrator(base_dir)
     for i in range(max_runs):
         try:
-            orch = Orchestrator(OrchestratorConfig(base_dir=base_dir))
             result = orch.tick()
             prompts = orch.suggest_skills(result.status)
 
@@ -350,25 +539,28 @@ def cmd_autopilot(args):
                 print(f"Project {args.project} completed!")
                 return 0
 
-            # 检查是否有正在运行的任务
-            has_running = any(t.get("state") == "running" for t in status.get("tasks", []))
+            # 检查是否有正在运行的任务（归约时已统计）
+            has_running = status.get("project", {}).get("runningCount", 0) > 0
             if not has_running and prompts:
                 print("Waiting for worker to spawn...")
-                time.sleep(2)
+                _wait_for_events_change(base_dir, 2)
 
         except Exception as e:
             print(f"Error: {e}")
 
-        time.sleep(interval)
+        # 日志一有新事件立即进入下一轮 tick；否则最多空等 interval 秒
+        _wait_for_events_change(base_dir, interval)
 
     print(f"Autopilot stopped after {max_runs} runs")
     return 0
 
 
 def cmd_oc_check(args):
+    from core.openclaw_client import OpenClawClient
+
     client = OpenClawClient(session_key=args.session_key)
     resp = client.sessions_list(limit=5)
-    print(json.dumps(resp, ensure_ascii=False, indent=2))
+    _pprint(resp)
     return 0
 
 
@@ -379,12 +571,16 @@ def _read_text(path: Path) -> str:
 
 
 def cmd_oc_start(args):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from core.openclaw_client import OpenClawClient
+
     base_dir = tiangong_dir(args.project)
     team_path = base_dir / "team.json"
     if not team_path.exists():
         print("ERROR: team.json not found. Run create first.")
         return 1
-    team = json.loads(team_path.read_text(encoding="utf-8"))
+    team = _cached_team(base_dir)
     project_root = team.get("path")
     plan_path = team.get("planPath")
     labels = team.get("labels", {})
@@ -411,8 +607,12 @@ def cmd_oc_start(args):
     )
 
     client = OpenClawClient(session_key=args.session_key)
-    pm_resp = client.sessions_spawn(task=pm_task, label=pm_label, cleanup="keep")
-    wd_resp = client.sessions_spawn(task=watchdog_task, label=watchdog_label, cleanup="keep")
+    # 两次 spawn 互不依赖，各是一次阻塞 HTTP 往返，并行发出
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        pm_fut = ex.submit(client.sessions_spawn, task=pm_task, label=pm_label, cleanup="keep")
+        wd_fut = ex.submit(client.sessions_spawn, task=watchdog_task, label=watchdog_label, cleanup="keep")
+        pm_resp = pm_fut.result()
+        wd_resp = wd_fut.result()
 
     print("PM spawn:", json.dumps(pm_resp, ensure_ascii=False))
     print("Watchdog spawn:", json.dumps(wd_resp, ensure_ascii=False))
@@ -421,6 +621,8 @@ def cmd_oc_start(args):
 
 
 def cmd_retry(args):
+    from core.ids import run_id
+
     base_dir = tiangong_dir(args.project)
     status = load_status(base_dir)
     proj = status.get("project", {})
@@ -438,120 +640,175 @@ def cmd_retry(args):
         "payload": {"reason": "manual_retry"},
         "idempotencyKey": f"{args.project}:{args.task_id}:{new_run}:WORKER_RUN_INTENT",
     }
-    sm = StateManager(base_dir)
+    sm = _sm(base_dir)
     sm.append_event(event)
-    Orchestrator(OrchestratorConfig(base_dir=base_dir)).tick()
+    _invalidate_status(base_dir)
+    _orchestrator(base_dir).tick()
     print(f"Retry intent for {args.task_id}: runId={new_run}")
     return 0
 
 
-def build_parser():
-    parser = argparse.ArgumentParser(prog="tiangong", description="Tiangong CLI (local)")
-    sub = parser.add_subparsers(dest="cmd")
+def _sub_list(sub):
+    p = sub.add_parser("list")
+    p.set_defaults(func=cmd_list)
+
+
+def _sub_create(sub):
+    p = sub.add_parser("create")
+    p.add_argument("project")
+    p.add_argument("root")
+    p.add_argument("plan", nargs="?")
+    p.add_argument("--session-key", default="main")
+    p.add_argument("--no-spawn", action="store_true")
+    p.set_defaults(func=cmd_create)
+
+
+def _sub_start(sub):
+    p = sub.add_parser("start")
+    p.add_argument("project")
+    p.set_defaults(func=cmd_start)
+
+
+def _sub_status(sub):
+    p = sub.add_parser("status")
+    p.add_argument("project")
+    p.set_defaults(func=cmd_status)
+
+
+def _sub_progress(sub):
+    p = sub.add_parser("progress")
+    p.add_argument("project")
+    p.set_defaults(func=cmd_progress)
+
+
+def _sub_risks(sub):
+    p = sub.add_parser("risks")
+    p.add_argument("project")
+    p.set_defaults(func=cmd_risks)
+
+
+def _sub_resume(sub, name="resume"):
+    p = sub.add_parser(name)
+    p.add_argument("project")
+    p.add_argument("--reason")
+    p.add_argument("--confirmed-by")
+    p.set_defaults(func=cmd_resume)
+
+
+def _sub_restore(sub):
+    _sub_resume(sub, name="restore")
+
 
-    p_list = sub.add_parser("list")
-    p_list.set_defaults(func=cmd_list)
-
-    p_create = sub.add_parser("create")
-    p_create.add_argument("project")
-    p_create.add_argument("root")
-    p_create.add_argument("plan", nargs="?")
-    p_create.add_argument("--session-key", default="main")
-    p_create.add_argument("--no-spawn", action="store_true")
-    p_create.set_defaults(func=cmd_create)
-
-    p_start = sub.add_parser("start")
-    p_start.add_argument("project")
-    p_start.set_defaults(func=cmd_start)
-
-    p_status = sub.add_parser("status")
-    p_status.add_argument("project")
-    p_status.set_defaults(func=cmd_status)
-
-    p_progress = sub.add_parser("progress")
-    p_progress.add_argument("project")
-    p_progress.set_defaults(func=cmd_progress)
-
-    p_risks = sub.add_parser("risks")
-    p_risks.add_argument("project")
-    p_risks.set_defaults(func=cmd_risks)
-
-    p_resume = sub.add_parser("resume")
-    p_resume.add_argument("project")
-    p_resume.add_argument("--reason")
-    p_resume.add_argument("--confirmed-by")
-    p_resume.set_defaults(func=cmd_resume)
-
-    p_restore = sub.add_parser("restore")
-    p_restore.add_argument("project")
-    p_restore.add_argument("--reason")
-    p_restore.add_argument("--confirmed-by")
-    p_restore.set_defaults(func=cmd_resume)
-
-    p_skill = sub.add_parser("choose-skill")
-    p_skill.add_argument("project")
-    p_skill.add_argument("task_id")
-    p_skill.add_argument("skill")
-    p_skill.set_defaults(func=cmd_choose_skill)
-
-    p_select = sub.add_parser("select-skill")
-    p_select.add_argument("project")
-    p_select.add_argument("task_id")
-    p_select.add_argument("skill")
-    p_select.set_defaults(func=cmd_choose_skill)
-
-    p_suggest = sub.add_parser("suggest-skill")
-    p_suggest.add_argument("project")
-    p_suggest.add_argument("task_id")
-    p_suggest.add_argument("--kind")
-    p_suggest.add_argument("--suggested", action="append")
-    p_suggest.add_argument("--json", action="store_true")
-    p_suggest.set_defaults(func=cmd_suggest_skill)
-
-    p_tier = sub.add_parser("approve-tier")
-    p_tier.add_argument("project")
-    p_tier.add_argument("task_id")
-    p_tier.add_argument("tier")
-    p_tier.add_argument("--reason")
-    p_tier.set_defaults(func=cmd_approve_tier)
-
-    p_verdict = sub.add_parser("human-verdict")
-    p_verdict.add_argument("project")
-    p_verdict.add_argument("task_id")
-    p_verdict.add_argument("verdict")
-    p_verdict.add_argument("--reason")
-    p_verdict.add_argument("--who")
-    p_verdict.set_defaults(func=cmd_human_verdict)
-
-    p_tick = sub.add_parser("tick")
-    p_tick.add_argument("project")
-    p_tick.set_defaults(func=cmd_tick)
-
-    p_autopilot = sub.add_parser("autopilot")
-    p_autopilot.add_argument("project")
-    p_autopilot.add_argument("--interval", type=int, default=10, help="Tick interval in seconds")
-    p_autopilot.add_argument("--max-runs", type=int, default=100, help="Max number of ticks")
-    p_autopilot.set_defaults(func=cmd_autopilot)
-
-    p_oc_check = sub.add_parser("oc-check")
-    p_oc_check.add_argument("--session-key", default="main")
-    p_oc_check.set_defaults(func=cmd_oc_check)
-
-    p_oc_start = sub.add_parser("oc-start")
-    p_oc_start.add_argument("project")
-    p_oc_start.add_argument("--session-key", default="main")
-    p_oc_start.set_defaults(func=cmd_oc_start)
-
-    p_retry = sub.add_parser("retry")
-    p_retry.add_argument("project")
-    p_retry.add_argument("task_id")
-    p_retry.set_defaults(func=cmd_retry)
+def _sub_choose_skill(sub, name="choose-skill"):
+    p = sub.add_parser(name)
+    p.add_argument("project")
+    p.add_argument("task_id")
+    p.add_argument("skill")
+    p.set_defaults(func=cmd_choose_skill)
 
+
+def _sub_select_skill(sub):
+    _sub_choose_skill(sub, name="select-skill")
+
+
+def _sub_suggest_skill(sub):
+    p = sub.add_parser("suggest-skill")
+    p.add_argument("project")
+    p.add_argument("task_id")
+    p.add_argument("--kind")
+    p.add_argument("--suggested", action="append")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_suggest_skill)
+
+
+def _sub_approve_tier(sub):
+    p = sub.add_parser("approve-tier")
+    p.add_argument("project")
+    p.add_argument("task_id")
+    p.add_argument("tier")
+    p.add_argument("--reason")
+    p.set_defaults(func=cmd_approve_tier)
+
+
+def _sub_human_verdict(sub):
+    p = sub.add_parser("human-verdict")
+    p.add_argument("project")
+    p.add_argument("task_id")
+    p.add_argument("verdict")
+    p.add_argument("--reason")
+    p.add_argument("--who")
+    p.set_defaults(func=cmd_human_verdict)
+
+
+def _sub_tick(sub):
+    p = sub.add_parser("tick")
+    p.add_argument("project")
+    p.set_defaults(func=cmd_tick)
+
+
+def _sub_autopilot(sub):
+    p = sub.add_parser("autopilot")
+    p.add_argument("project")
+    p.add_argument("--interval", type=int, default=10, help="Tick interval in seconds")
+    p.add_argument("--max-runs", type=int, default=100, help="Max number of ticks")
+    p.set_defaults(func=cmd_autopilot)
+
+
+def _sub_oc_check(sub):
+    p = sub.add_parser("oc-check")
+    p.add_argument("--session-key", default="main")
+    p.set_defaults(func=cmd_oc_check)
+
+
+def _sub_oc_start(sub):
+    p = sub.add_parser("oc-start")
+    p.add_argument("project")
+    p.add_argument("--session-key", default="main")
+    p.set_defaults(func=cmd_oc_start)
+
+
+def _sub_retry(sub):
+    p = sub.add_parser("retry")
+    p.add_argument("project")
+    p.add_argument("task_id")
+    p.set_defaults(func=cmd_retry)
+
+
+_SUBCOMMANDS = {
+    "list": _sub_list,
+    "create": _sub_create,
+    "start": _sub_start,
+    "status": _sub_status,
+    "progress": _sub_progress,
+    "risks": _sub_risks,
+    "resume": _sub_resume,
+    "restore": _sub_restore,
+    "choose-skill": _sub_choose_skill,
+    "select-skill": _sub_select_skill,
+    "suggest-skill": _sub_suggest_skill,
+    "approve-tier": _sub_approve_tier,
+    "human-verdict": _sub_human_verdict,
+    "tick": _sub_tick,
+    "autopilot": _sub_autopilot,
+    "oc-check": _sub_oc_check,
+    "oc-start": _sub_oc_start,
+    "retry": _sub_retry,
+}
+
+
+def build_parser(names=None):
+    parser = argparse.ArgumentParser(prog="tiangong", description="Tiangong CLI (local)")
+    sub = parser.add_subparsers(dest="cmd")
+    for name in (names if names is not None else _SUBCOMMANDS):
+        _SUBCOMMANDS[name](sub)
     return parser
 
 
 def main():
-    parser = build_parser()
+    # 只构建本次调用的子命令；--help/无参数/未知命令回退到完整构建
+    first = sys.argv[1] if len(sys.argv) > 1 else None
+    names = [first] if first in _SUBCOMMANDS else None
+    parser = build_parser(names)
     args = parser.parse_args()
     if not args.cmd:
         parser.print_help()
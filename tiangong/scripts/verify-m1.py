@@ -8,6 +8,7 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 from datetime import datetime, timezone
 from pathlib import Path
@@ -53,10 +54,8 @@ def test_crc32():
         
         # 读取并验证
         events_path = base_dir / "audit" / "events.ndjson"
-        with open(events_path, "r") as f:
-            line = f.readline()
-            saved_event = json.loads(line)
-        
+        saved_event = json.loads(events_path.read_bytes().splitlines()[0])
+
         assert verify_crc32(saved_event), "CRC32 验证应通过"
         log("  ✅ CRC32 校验通过")
         
@@ -104,11 +103,8 @@ def test_truncated_recovery():
         orch.tick()
         
         # 检查是否写入 RECOVERY_STARTED
-        with open(events_path, "r") as f:
-            lines = f.readlines()
-            has_recovery = any("RECOVERY_STARTED" in line for line in lines)
-            assert has_recovery, "应写入 RECOVERY_STARTED 事件"
-            log("  ✅ 写入 RECOVERY_STARTED 事件")
+        assert b"RECOVERY_STARTED" in events_path.read_bytes(), "应写入 RECOVERY_STARTED 事件"
+        log("  ✅ 写入 RECOVERY_STARTED 事件")
         
         # 检查 degraded 模式
         status = json.loads((base_dir / "status.json").read_text())
@@ -129,9 +125,10 @@ def test_lock_timeout():
         # 创建锁文件
         lock = FileLock(lock_path, timeout=0.5, poll_interval=0.05)
         lock.acquire()
-        
-        # 另一个进程尝试获取锁（使用 subprocess 模拟）
-        script = f'''
+
+        if "--integration" in sys.argv:
+            # 跨进程争锁（完整路径，含解释器冷启动）
+            script = f'''
 import sys
 sys.path.insert(0, "{TOOL_ROOT}")
 from pathlib import Path
@@ -142,16 +139,32 @@ try:
 except LockTimeout:
     print("TIMEOUT")
 '''
-        result = subprocess.run(
-            [sys.executable, "-c", script],
-            capture_output=True,
-            text=True,
-            cwd=TOOL_ROOT
-        )
-        
-        assert "TIMEOUT" in result.stdout, "应触发锁超时"
+            result = subprocess.run(
+                [sys.executable, "-c", script],
+                capture_output=True,
+                text=True,
+                cwd=TOOL_ROOT
+            )
+            assert "TIMEOUT" in result.stdout, "应触发锁超时"
+        else:
+            # flock 按文件描述符生效，线程内第二次 open 同样会争锁，
+            # 省掉每次验收 ~100ms 的子进程解释器启动
+            outcome = []
+
+            def contender():
+                try:
+                    with FileLock(lock_path, timeout=0.2, poll_interval=0.02):
+                        outcome.append("LOCK_ACQUIRED")
+                except LockTimeout:
+                    outcome.append("TIMEOUT")
+
+            t = threading.Thread(target=contender)
+            t.start()
+            t.join()
+            assert outcome == ["TIMEOUT"], "应触发锁超时"
+
         log("  ✅ 锁超时检测通过")
-        
+
         lock.release()
         
     return True
@@ -199,11 +212,8 @@ def test_watchdog_heartbeat():
         
         # 检查是否写入 WATCHDOG_UNRESPONSIVE
         events_path = base_dir / "audit" / "events.ndjson"
-        with open(events_path, "r") as f:
-            lines = f.readlines()
-            has_unresponsive = any("WATCHDOG_UNRESPONSIVE" in line for line in lines)
-            assert has_unresponsive, "应写入 WATCHDOG_UNRESPONSIVE 事件"
-            log("  ✅ 写入 WATCHDOG_UNRESPONSIVE 事件")
+        assert b"WATCHDOG_UNRESPONSIVE" in events_path.read_bytes(), "应写入 WATCHDOG_UNRESPONSIVE 事件"
+        log("  ✅ 写入 WATCHDOG_UNRESPONSIVE 事件")
         
         # 检查 degraded 模式
         status = json.loads((base_dir / "status.json").read_text())
@@ -245,10 +255,9 @@ def test_idempotency():
         assert result2["status"] == "deduped", "第二次应去重"
         
         events_path = base_dir / "audit" / "events.ndjson"
-        with open(events_path, "r") as f:
-            lines = [l for l in f.readlines() if l.strip()]
-            assert len(lines) == 1, "只应有一条事件"
-        
+        lines = [l for l in events_path.read_bytes().splitlines() if l.strip()]
+        assert len(lines) == 1, "只应有一条事件"
+
         log("  ✅ 幂等性通过")
         
     return True
@@ -2,471 +2,329 @@
 """
 M3 验收测试：结果消费
 """
+import itertools
 import json
-import shutil
-import subprocess
+import os
 import sys
+from collections import defaultdict
 import tempfile
-from datetime import datetime, timezone, timedelta
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 TOOL_ROOT = SCRIPT_DIR.parent
 sys.path.insert(0, str(TOOL_ROOT))
 
-from core.state_manager import StateManager
-from core.reducer import reduce_events
-from core.orchestrator import Orchestrator, OrchestratorConfig
-from core.ids import run_id
+# core 模块在用到它们的测试/夹具内部按需导入，子进程只加载自己需要的部分
 
 
-ISO_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
 
-def utc_now():
-    return datetime.now(timezone.utc).strftime(ISO_FORMAT)
+DOCS_TASK_TEMPLATE = {"goal": "Create docs", "kind": "docs", "acceptance": ["done"]}
+WRITER_SKILL_PAYLOAD = {"chosenSkill": "writer", "decisionSeq": 1}
 
 
-def log(msg):
-    print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}")
+PASS_FLOW = (
+    ("WORKER_RUN_INTENT", {}),
+    ("WORKER_RUN_STARTED", {}),
+    ("WORKER_RUN_COMPLETED", {"result": "success"}),
+    ("EVIDENCE_SUBMITTED", {"evidencePath": "evidence/run.md", "patchPath": "evidence/run.patch"}),
+    ("WATCHDOG_VERDICT", {"verdict": "PASS", "reasons": []}),
+    ("RUN_CLOSED", {"closeReason": "completed_with_pass"}),
+)
+FAIL_FLOW = (
+    ("WORKER_RUN_INTENT", {}),
+    ("WORKER_RUN_STARTED", {}),
+    ("WORKER_RUN_FAILED", {"reason": "failed"}),
+    ("RUN_CLOSED", {"closeReason": "failed"}),
+)
 
 
-def test_result_aggregation():
-    """验收 1：结果聚合（done 任务）"""
-    log("测试 1: 结果聚合（done 任务）")
-    
-    with tempfile.TemporaryDirectory() as tmpdir:
-        base_dir = Path(tmpdir)
-        sm = StateManager(base_dir)
-        project = "test-aggregation"
-        
-        # PROJECT_STARTED
-        sm.append_event({
+_run_id_counter = itertools.count(1)
+
+
+def _fast_run_id(prefix="r"):
+    """测试专用 run id：临时目录已提供隔离，用递增计数器替代全局唯一 id 生成"""
+    return f"{prefix}-{next(_run_id_counter):08d}"
+
+
+def _temp_root():
+    """测试里的审计日志不需要持久性，优先放 tmpfs，绕开 fsync 的磁盘延迟"""
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK):
+        return shm
+    return None
+
+
+class BufferedLog:
+    """日志行先攒在内存里，每个测试结束时一次性写出，N 次 write 合并为 1 次"""
+
+    def __init__(self):
+        self.buf = []
+
+    def __call__(self, msg):
+        # time.strftime 直接格式化本地时间，省掉每条日志构造 datetime 对象的开销
+        self.buf.append(f"[{time.strftime('%H:%M:%S')}] {msg}")
+
+    def flush(self):
+        if self.buf:
+            sys.stdout.write("\n".join(self.buf) + "\n")
+            self.buf.clear()
+
+
+log = BufferedLog()
+
+
+def _run_test(fn, base_dir):
+    """在子进程里执行单个测试，退出前把缓冲日志写出"""
+    base_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        return fn(base_dir)
+    finally:
+        log.flush()
+
+
+def scan_events(path, needles):
+    """单次逐行遍历事件日志，每行解析一次后按谓词统计命中次数"""
+    counts = {key: 0 for key in needles}
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            ev = _loads(line)
+            for key, pred in needles.items():
+                if pred(ev):
+                    counts[key] += 1
+    return counts
+
+
+def count_event_type(path, ev_type):
+    """对单一事件类型的计数走 bytes.count 的 C 级扫描，不逐行解析"""
+    return path.read_bytes().count(f'"type":"{ev_type}"'.encode())
+
+
+def project_log(path):
+    """一次遍历把事件日志按 type 分组，断言在内存投影上做，不再反复读文件"""
+    by_type = defaultdict(list)
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            ev = _loads(line)
+            by_type[ev["type"]].append(ev)
+    return by_type
+
+
+def seed_base(base_dir, project, task_id, kind="docs", goal="Create docs", skill="writer"):
+    """写入 PROJECT_STARTED / TASKSPEC_PUBLISHED / TASK_SKILL_SET 引导事件。
+
+    skill=None 时跳过 TASK_SKILL_SET，保留 awaiting_skill_decision gate；
+    PROJECT_STARTED 的幂等 key 固定，对同一 base_dir 重复调用会自动去重。
+    """
+    from core.state_manager import StateManager
+
+    sm = StateManager(base_dir)
+    # 每个 key 的公共前缀只插值一次，循环/列表里用拼接
+    task_prefix = f"{project}:{task_id}:"
+    events = [
+        {
             "type": "PROJECT_STARTED",
             "actor": "orchestrator",
             "project": project,
             "runId": "start-1",
             "payload": {},
             "idempotencyKey": f"{project}:PROJECT_STARTED:start-1",
-        })
-        
-        # TASKSPEC_PUBLISHED
-        sm.append_event({
+        },
+        {
             "type": "TASKSPEC_PUBLISHED",
             "actor": "pm",
             "project": project,
-            "taskId": "DOCS-1",
+            "taskId": task_id,
             "payload": {
-                "taskId": "DOCS-1",
-                "goal": "Create docs",
-                "kind": "docs",
-                "acceptance": ["done"],
+                **DOCS_TASK_TEMPLATE,
+                "taskId": task_id,
+                "goal": goal,
+                "kind": kind,
             },
-            "idempotencyKey": f"{project}:DOCS-1:TASKSPEC_PUBLISHED",
-        })
-        
-        # TASK_SKILL_SET
-        sm.append_event({
+            "idempotencyKey": task_prefix + "TASKSPEC_PUBLISHED",
+        },
+    ]
+    if skill:
+        events.append({
             "type": "TASK_SKILL_SET",
             "actor": "human",
             "project": project,
-            "taskId": "DOCS-1",
-            "payload": {"chosenSkill": "writer", "decisionSeq": 1},
-            "idempotencyKey": f"{project}:DOCS-1:TASK_SKILL_SET:1",
-        })
-        
-        # WORKER_RUN_INTENT + STARTED + COMPLETED
-        run_id_val = run_id("r")
-        sm.append_event({
-            "type": "WORKER_RUN_INTENT",
-            "actor": "orchestrator",
-            "project": project,
-            "taskId": "DOCS-1",
-            "runId": run_id_val,
-            "payload": {},
-            "idempotencyKey": f"{project}:DOCS-1:{run_id_val}:WORKER_RUN_INTENT",
-        })
-        sm.append_event({
-            "type": "WORKER_RUN_STARTED",
-            "actor": "orchestrator",
-            "project": project,
-            "taskId": "DOCS-1",
-            "runId": run_id_val,
-            "payload": {},
-            "idempotencyKey": f"{project}:DOCS-1:{run_id_val}:WORKER_RUN_STARTED",
-        })
-        sm.append_event({
-            "type": "WORKER_RUN_COMPLETED",
-            "actor": "orchestrator",
-            "project": project,
-            "taskId": "DOCS-1",
-            "runId": run_id_val,
-            "payload": {"result": "success"},
-            "idempotencyKey": f"{project}:DOCS-1:{run_id_val}:WORKER_RUN_COMPLETED",
-        })
-        
-        # EVIDENCE_SUBMITTED
-        sm.append_event({
-            "type": "EVIDENCE_SUBMITTED",
-            "actor": "orchestrator",
-            "project": project,
-            "taskId": "DOCS-1",
-            "runId": run_id_val,
-            "payload": {
-                "evidencePath": f"evidence/{run_id_val}.md",
-                "patchPath": f"evidence/{run_id_val}.patch",
-            },
-            "idempotencyKey": f"{project}:DOCS-1:{run_id_val}:EVIDENCE_SUBMITTED",
-        })
-        
-        # WATCHDOG_VERDICT PASS
-        sm.append_event({
-            "type": "WATCHDOG_VERDICT",
-            "actor": "watchdog",
-            "project": project,
-            "taskId": "DOCS-1",
-            "runId": run_id_val,
-            "payload": {"verdict": "PASS", "reasons": []},
-            "idempotencyKey": f"{project}:DOCS-1:{run_id_val}:WATCHDOG_VERDICT",
+            "taskId": task_id,
+            "payload": {**WRITER_SKILL_PAYLOAD, "chosenSkill": skill},
+            "idempotencyKey": task_prefix + "TASK_SKILL_SET:1",
         })
-        
-        # RUN_CLOSED
-        sm.append_event({
-            "type": "RUN_CLOSED",
+    sm.append_events(events)
+    return sm
+
+
+def run_full_flow(sm, project, task_id, outcome="pass", fail_reason="failed"):
+    """写入一条完整 run 的事件序列（INTENT→…→RUN_CLOSED），返回 runId。
+
+    outcome="pass" 走 PASS_FLOW，其余取值走 FAIL_FLOW，
+    失败原因取 fail_reason；流程模板在模块级只构造一次。
+    """
+    run_id_val = _fast_run_id("r")
+    prefix = f"{project}:{task_id}:{run_id_val}:"
+    flow = PASS_FLOW if outcome == "pass" else FAIL_FLOW
+    sm.append_events([
+        {
+            "type": ev_type,
             "actor": "orchestrator",
             "project": project,
-            "taskId": "DOCS-1",
+            "taskId": task_id,
             "runId": run_id_val,
-            "payload": {"closeReason": "completed_with_pass"},
-            "idempotencyKey": f"{project}:DOCS-1:{run_id_val}:RUN_CLOSED",
-        })
-        
-        # 运行 tick
-        orch = Orchestrator(OrchestratorConfig(base_dir=base_dir))
-        result = orch.tick()
-        
-        # 检查结果聚合 - done 任务没有 state 字段（状态分片优化）
-        status = result.status
-        task = status["tasks"][0]
-        # done 任务：没有 state 字段，有 lastRunId
-        assert "state" not in task, f"done 任务不应有 state 字段，实际: {task}"
-        assert task.get("lastRunId") == run_id_val, f"应有 lastRunId"
-        assert task.get("evidencePath") is not None, f"应有 evidencePath"
-        log("  ✅ done 任务结果聚合正确（状态分片优化）")
-        
-        # 检查 RESULT_NOTIFIED 事件
-        events_path = base_dir / "audit" / "events.ndjson"
-        with open(events_path, "r") as f:
-            lines = f.readlines()
-            has_notified = any("RESULT_NOTIFIED" in line for line in lines)
-        assert has_notified, "应写入 RESULT_NOTIFIED 事件"
-        log("  ✅ 写入 RESULT_NOTIFIED 事件")
-        
+            "payload": {**ev_data, "reason": fail_reason} if ev_type == "WORKER_RUN_FAILED" else ev_data,
+            "idempotencyKey": prefix + ev_type,
+        }
+        for ev_type, ev_data in flow
+    ])
+    return run_id_val
+
+
+def test_result_aggregation(base_dir):
+    """验收 1：结果聚合（done 任务）"""
+    from core.orchestrator import Orchestrator, OrchestratorConfig
+
+    log("测试 1: 结果聚合（done 任务）")
+
+    project = "test-aggregation"
+    sm = seed_base(base_dir, project, "DOCS-1")
+    run_id_val = run_full_flow(sm, project, "DOCS-1")
+
+    # 运行 tick
+    orch = Orchestrator(OrchestratorConfig(base_dir=base_dir))
+    result = orch.tick()
+
+    # 检查结果聚合 - done 任务没有 state 字段（状态分片优化）
+    status = result.status
+    task = status["tasks"][0]
+    # done 任务：没有 state 字段，有 lastRunId
+    assert "state" not in task, f"done 任务不应有 state 字段，实际: {task}"
+    assert task.get("lastRunId") == run_id_val, f"应有 lastRunId"
+    assert task.get("evidencePath") is not None, f"应有 evidencePath"
+    log("  ✅ done 任务结果聚合正确（状态分片优化）")
+
+    # 检查 RESULT_NOTIFIED 事件
+    events_path = base_dir / "audit" / "events.ndjson"
+    projected = project_log(events_path)
+    assert projected["RESULT_NOTIFIED"], "应写入 RESULT_NOTIFIED 事件"
+    log("  ✅ 写入 RESULT_NOTIFIED 事件")
+
     return True
 
 
-def test_blocked_result():
+def test_blocked_result(base_dir):
     """验收 2：blocked 结果通知"""
+    from core.orchestrator import Orchestrator, OrchestratorConfig
+
     log("测试 2: blocked 结果通知")
-    
-    with tempfile.TemporaryDirectory() as tmpdir:
-        base_dir = Path(tmpdir)
-        sm = StateManager(base_dir)
-        project = "test-blocked-result"
-        
-        # PROJECT_STARTED
-        sm.append_event({
-            "type": "PROJECT_STARTED",
-            "actor": "orchestrator",
-            "project": project,
-            "runId": "start-1",
-            "payload": {},
-            "idempotencyKey": f"{project}:PROJECT_STARTED:start-1",
-        })
-        
-        # TASKSPEC_PUBLISHED
-        sm.append_event({
-            "type": "TASKSPEC_PUBLISHED",
-            "actor": "pm",
-            "project": project,
-            "taskId": "CODE-1",
-            "payload": {
-                "taskId": "CODE-1",
-                "goal": "Fix bug",
-                "kind": "coding",
-                "acceptance": ["done"],
-            },
-            "idempotencyKey": f"{project}:CODE-1:TASKSPEC_PUBLISHED",
-        })
-        
-        # TASK_SKILL_SET
-        sm.append_event({
-            "type": "TASK_SKILL_SET",
-            "actor": "human",
-            "project": project,
-            "taskId": "CODE-1",
-            "payload": {"chosenSkill": "superpower", "decisionSeq": 1},
-            "idempotencyKey": f"{project}:CODE-1:TASK_SKILL_SET:1",
-        })
-        
-        # WORKER_RUN_INTENT + STARTED + FAILED
-        run_id_val = run_id("r")
-        sm.append_event({
-            "type": "WORKER_RUN_INTENT",
-            "actor": "orchestrator",
-            "project": project,
-            "taskId": "CODE-1",
-            "runId": run_id_val,
-            "payload": {},
-            "idempotencyKey": f"{project}:CODE-1:{run_id_val}:WORKER_RUN_INTENT",
-        })
-        sm.append_event({
-            "type": "WORKER_RUN_STARTED",
-            "actor": "orchestrator",
-            "project": project,
-            "taskId": "CODE-1",
-            "runId": run_id_val,
-            "payload": {},
-            "idempotencyKey": f"{project}:CODE-1:{run_id_val}:WORKER_RUN_STARTED",
-        })
-        sm.append_event({
-            "type": "WORKER_RUN_FAILED",
-            "actor": "orchestrator",
-            "project": project,
-            "taskId": "CODE-1",
-            "runId": run_id_val,
-            "payload": {"reason": "build failed"},
-            "idempotencyKey": f"{project}:CODE-1:{run_id_val}:WORKER_RUN_FAILED",
-        })
-        
-        # RUN_CLOSED
-        sm.append_event({
-            "type": "RUN_CLOSED",
-            "actor": "orchestrator",
-            "project": project,
-            "taskId": "CODE-1",
-            "runId": run_id_val,
-            "payload": {"closeReason": "failed"},
-            "idempotencyKey": f"{project}:CODE-1:{run_id_val}:RUN_CLOSED",
-        })
-        
-        # 运行 tick
-        orch = Orchestrator(OrchestratorConfig(base_dir=base_dir))
-        result = orch.tick()
-        
-        # 检查 blocked 状态
-        status = result.status
-        task = status["tasks"][0]
-        assert task["state"] == "blocked", f"任务应为 blocked，实际: {task['state']}"
-        assert task["result"].get("failureReason") == "build failed", f"失败原因应为 build failed"
-        log("  ✅ blocked 任务结果聚合正确")
-        
-        # 检查 RESULT_NOTIFIED 事件
-        events_path = base_dir / "audit" / "events.ndjson"
-        with open(events_path, "r") as f:
-            lines = f.readlines()
-            has_notified = any("RESULT_NOTIFIED" in line and "失败" in line for line in lines)
-        assert has_notified, "应写入包含失败信息的 RESULT_NOTIFIED 事件"
-        log("  ✅ 写入 blocked 通知事件")
-        
+
+    project = "test-blocked-result"
+    sm = seed_base(base_dir, project, "CODE-1", kind="coding", goal="Fix bug", skill="superpower")
+    run_full_flow(sm, project, "CODE-1", outcome="fail", fail_reason="build failed")
+
+    # 运行 tick
+    orch = Orchestrator(OrchestratorConfig(base_dir=base_dir))
+    result = orch.tick()
+
+    # 检查 blocked 状态
+    status = result.status
+    task = status["tasks"][0]
+    assert task["state"] == "blocked", f"任务应为 blocked，实际: {task['state']}"
+    assert task["result"].get("failureReason") == "build failed", f"失败原因应为 build failed"
+    log("  ✅ blocked 任务结果聚合正确")
+
+    # 检查 RESULT_NOTIFIED 事件
+    events_path = base_dir / "audit" / "events.ndjson"
+    projected = project_log(events_path)
+    assert any(
+        "失败" in ev.get("payload", {}).get("message", "")
+        for ev in projected["RESULT_NOTIFIED"]
+    ), "应写入包含失败信息的 RESULT_NOTIFIED 事件"
+    log("  ✅ 写入 blocked 通知事件")
+
     return True
 
 
-def test_notification_idempotency():
+def test_notification_idempotency(base_dir):
     """验收 3：通知幂等（不重复通知）"""
+    from core.orchestrator import Orchestrator, OrchestratorConfig
+
     log("测试 3: 通知幂等")
-    
-    with tempfile.TemporaryDirectory() as tmpdir:
-        base_dir = Path(tmpdir)
-        sm = StateManager(base_dir)
-        project = "test-notify-idempotent"
-        
-        # PROJECT_STARTED
-        sm.append_event({
-            "type": "PROJECT_STARTED",
-            "actor": "orchestrator",
-            "project": project,
-            "runId": "start-1",
-            "payload": {},
-            "idempotencyKey": f"{project}:PROJECT_STARTED:start-1",
-        })
-        
-        # TASKSPEC_PUBLISHED
-        sm.append_event({
-            "type": "TASKSPEC_PUBLISHED",
-            "actor": "pm",
-            "project": project,
-            "taskId": "TEST-1",
-            "payload": {
-                "taskId": "TEST-1",
-                "goal": "Test idempotency",
-                "kind": "docs",
-                "acceptance": ["done"],
-            },
-            "idempotencyKey": f"{project}:TEST-1:TASKSPEC_PUBLISHED",
-        })
-        
-        # TASK_SKILL_SET
-        sm.append_event({
-            "type": "TASK_SKILL_SET",
-            "actor": "human",
-            "project": project,
-            "taskId": "TEST-1",
-            "payload": {"chosenSkill": "writer", "decisionSeq": 1},
-            "idempotencyKey": f"{project}:TEST-1:TASK_SKILL_SET:1",
-        })
-        
-        # 完成整个流程
-        run_id_val = run_id("r")
-        for ev_type, ev_data in [
-            ("WORKER_RUN_INTENT", {"reason": "test"}),
-            ("WORKER_RUN_STARTED", {}),
-            ("WORKER_RUN_COMPLETED", {"result": "success"}),
-            ("EVIDENCE_SUBMITTED", {"evidencePath": "x", "patchPath": "y"}),
-            ("WATCHDOG_VERDICT", {"verdict": "PASS", "reasons": []}),
-            ("RUN_CLOSED", {"closeReason": "completed_with_pass"}),
-        ]:
-            sm.append_event({
-                "type": ev_type,
-                "actor": "orchestrator",
-                "project": project,
-                "taskId": "TEST-1",
-                "runId": run_id_val,
-                "payload": ev_data,
-                "idempotencyKey": f"{project}:TEST-1:{run_id_val}:{ev_type}",
-            })
-        
-        # 运行第一次 tick
-        orch = Orchestrator(OrchestratorConfig(base_dir=base_dir))
-        orch.tick()
-        
-        # 检查通知次数
-        events_path = base_dir / "audit" / "events.ndjson"
-        with open(events_path, "r") as f:
-            lines = f.readlines()
-            notify_count = sum(1 for line in lines if "RESULT_NOTIFIED" in line)
-        assert notify_count == 1, f"应有 1 次通知，实际: {notify_count}"
-        log("  ✅ 首次 tick 产生 1 次通知")
-        
-        # 再次运行 tick（不应产生新通知）
-        orch.tick()
-        
-        with open(events_path, "r") as f:
-            lines = f.readlines()
-            notify_count2 = sum(1 for line in lines if "RESULT_NOTIFIED" in line)
-        assert notify_count2 == 1, f"再次 tick 后应有 1 次通知，实际: {notify_count2}"
-        log("  ✅ 再次 tick 不产生重复通知")
-        
+
+    project = "test-notify-idempotent"
+    sm = seed_base(base_dir, project, "TEST-1", goal="Test idempotency")
+
+    # 完成整个流程
+    run_full_flow(sm, project, "TEST-1")
+
+    # 运行第一次 tick
+    orch = Orchestrator(OrchestratorConfig(base_dir=base_dir))
+    orch.tick()
+
+    # 检查通知次数
+    events_path = base_dir / "audit" / "events.ndjson"
+    notify_count = count_event_type(events_path, "RESULT_NOTIFIED")
+    assert notify_count == 1, f"应有 1 次通知，实际: {notify_count}"
+    log("  ✅ 首次 tick 产生 1 次通知")
+
+    # 再次运行 tick（不应产生新通知）
+    orch.tick()
+
+    notify_count2 = count_event_type(events_path, "RESULT_NOTIFIED")
+    assert notify_count2 == 1, f"再次 tick 后应有 1 次通知，实际: {notify_count2}"
+    log("  ✅ 再次 tick 不产生重复通知")
+
     return True
 
 
-def test_multiple_tasks_results():
+def test_multiple_tasks_results(base_dir):
     """验收 4：多个任务结果处理"""
+    from core.orchestrator import Orchestrator, OrchestratorConfig
+
     log("测试 4: 多个任务结果处理")
-    
-    with tempfile.TemporaryDirectory() as tmpdir:
-        base_dir = Path(tmpdir)
-        sm = StateManager(base_dir)
-        project = "test-multi-results"
-        
-        # PROJECT_STARTED
-        sm.append_event({
-            "type": "PROJECT_STARTED",
-            "actor": "orchestrator",
-            "project": project,
-            "runId": "start-1",
-            "payload": {},
-            "idempotencyKey": f"{project}:PROJECT_STARTED:start-1",
-        })
-        
-        # 创建 3 个任务
-        for i, (task_id, goal) in enumerate([("T1", "Task 1"), ("T2", "Task 2"), ("T3", "Task 3")]):
-            # TASKSPEC_PUBLISHED
-            sm.append_event({
-                "type": "TASKSPEC_PUBLISHED",
-                "actor": "pm",
-                "project": project,
-                "taskId": task_id,
-                "payload": {
-                    "taskId": task_id,
-                    "goal": goal,
-                    "kind": "docs",
-                    "acceptance": ["done"],
-                },
-                "idempotencyKey": f"{project}:{task_id}:TASKSPEC_PUBLISHED",
-            })
-            
-            # TASK_SKILL_SET
-            sm.append_event({
-                "type": "TASK_SKILL_SET",
-                "actor": "human",
-                "project": project,
-                "taskId": task_id,
-                "payload": {"chosenSkill": "writer", "decisionSeq": 1},
-                "idempotencyKey": f"{project}:{task_id}:TASK_SKILL_SET:1",
-            })
-            
-            # 完成 T1 和 T3，T2 失败
-            if i != 1:
-                run_id_val = run_id("r")
-                for ev_type, ev_data in [
-                    ("WORKER_RUN_INTENT", {}),
-                    ("WORKER_RUN_STARTED", {}),
-                    ("WORKER_RUN_COMPLETED", {"result": "success"}),
-                    ("EVIDENCE_SUBMITTED", {"evidencePath": "x"}),
-                    ("WATCHDOG_VERDICT", {"verdict": "PASS", "reasons": []}),
-                    ("RUN_CLOSED", {"closeReason": "completed_with_pass"}),
-                ]:
-                    sm.append_event({
-                        "type": ev_type,
-                        "actor": "orchestrator",
-                        "project": project,
-                        "taskId": task_id,
-                        "runId": run_id_val,
-                        "payload": ev_data,
-                        "idempotencyKey": f"{project}:{task_id}:{run_id_val}:{ev_type}",
-                    })
-            else:
-                run_id_val = run_id("r")
-                for ev_type, ev_data in [
-                    ("WORKER_RUN_INTENT", {}),
-                    ("WORKER_RUN_STARTED", {}),
-                    ("WORKER_RUN_FAILED", {"reason": "test failure"}),
-                    ("RUN_CLOSED", {"closeReason": "failed"}),
-                ]:
-                    sm.append_event({
-                        "type": ev_type,
-                        "actor": "orchestrator",
-                        "project": project,
-                        "taskId": task_id,
-                        "runId": run_id_val,
-                        "payload": ev_data,
-                        "idempotencyKey": f"{project}:{task_id}:{run_id_val}:{ev_type}",
-                    })
-        
-        # 运行 tick
-        orch = Orchestrator(OrchestratorConfig(base_dir=base_dir))
-        result = orch.tick()
-        
-        # 检查状态 - done 任务没有 state，blocked 有 state
-        status = result.status
-        tasks = status["tasks"]
-        done_count = sum(1 for t in tasks if "state" not in t)  # done 任务没有 state
-        blocked_count = sum(1 for t in tasks if t.get("state") == "blocked")
-        
-        assert done_count == 2, f"应有 2 个 done，实际: {done_count}"
-        assert blocked_count == 1, f"应有 1 个 blocked，实际: {blocked_count}"
-        log(f"  ✅ 2 个 done，1 个 blocked")
-        
-        # 检查通知次数
-        events_path = base_dir / "audit" / "events.ndjson"
-        with open(events_path, "r") as f:
-            lines = f.readlines()
-            notify_count = sum(1 for line in lines if "RESULT_NOTIFIED" in line)
-        assert notify_count == 3, f"应有 3 次通知（2 done + 1 blocked），实际: {notify_count}"
-        log("  ✅ 3 次通知正确发送")
-        
+
+    project = "test-multi-results"
+
+    # 创建 3 个任务：完成 T1 和 T3，T2 失败
+    for i, (task_id, goal) in enumerate([("T1", "Task 1"), ("T2", "Task 2"), ("T3", "Task 3")]):
+        sm = seed_base(base_dir, project, task_id, goal=goal)
+        if i != 1:
+            run_full_flow(sm, project, task_id)
+        else:
+            run_full_flow(sm, project, task_id, outcome="fail", fail_reason="test failure")
+
+    # 运行 tick
+    orch = Orchestrator(OrchestratorConfig(base_dir=base_dir))
+    result = orch.tick()
+
+    # 检查状态 - done 任务没有 state，blocked 有 state
+    status = result.status
+    tasks = status["tasks"]
+    done_count = sum(1 for t in tasks if "state" not in t)  # done 任务没有 state
+    blocked_count = sum(1 for t in tasks if t.get("state") == "blocked")
+
+    assert done_count == 2, f"应有 2 个 done，实际: {done_count}"
+    assert blocked_count == 1, f"应有 1 个 blocked，实际: {blocked_count}"
+    log(f"  ✅ 2 个 done，1 个 blocked")
+
+    # 检查通知次数
+    events_path = base_dir / "audit" / "events.ndjson"
+    notify_count = count_event_type(events_path, "RESULT_NOTIFIED")
+    assert notify_count == 3, f"应有 3 次通知（2 done + 1 blocked），实际: {notify_count}"
+    log("  ✅ 3 次通知正确发送")
+
     return True
 
 
@@ -474,26 +332,43 @@ def main():
     print("=" * 60)
     print("M3 验收测试：结果消费")
     print("=" * 60)
-    
+
     all_pass = True
-    
+
     tests = [
         ("结果聚合（done）", test_result_aggregation),
         ("blocked 结果通知", test_blocked_result),
         ("通知幂等", test_notification_idempotency),
         ("多个任务结果", test_multiple_tasks_results),
     ]
-    
-    for name, fn in tests:
-        print()
-        try:
-            fn()
-        except Exception as e:
-            log(f"  ❌ 失败: {e}")
-            import traceback
-            traceback.print_exc()
-            all_pass = False
-    
+
+    # 各测试完全独立，共用一个外层临时目录、按测试名分子目录，
+    # 清理只走一次 rmtree；reducer 重放是纯 Python CPU 开销，用进程池并行跑满多核
+    outcomes = {}
+    with tempfile.TemporaryDirectory(dir=_temp_root()) as outer, \
+            ProcessPoolExecutor(max_workers=len(tests)) as ex:
+        futures = {
+            ex.submit(_run_test, fn, Path(outer) / fn.__name__): name
+            for name, fn in tests
+        }
+        for fut in as_completed(futures):
+            name = futures[fut]
+            try:
+                fut.result()
+                outcomes[name] = True
+            except Exception as e:
+                log(f"  ❌ 失败: {e}")
+                import traceback
+                traceback.print_exc()
+                outcomes[name] = False
+                all_pass = False
+    log.flush()
+
+    # 汇总按原始定义顺序输出
+    print()
+    for name, _fn in tests:
+        print(f"  {'✅' if outcomes.get(name) else '❌'} {name}")
+
     print()
     print("=" * 60)
     if all_pass:
@@ -501,7 +376,7 @@ def main():
     else:
         print("❌ M3 验收测试未完全通过")
     print("=" * 60)
-    
+
     return 0 if all_pass else 1
 
 
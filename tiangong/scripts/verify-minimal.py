@@ -4,6 +4,7 @@ import hashlib
 import json
 import os
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 import sys
@@ -17,19 +18,38 @@ from core.reducer import reduce_events
 from core.ids import run_id
 
 
+# invariant TaskSpec fields built once; per-call overrides stay tiny
+_TASKSPEC_TEMPLATE = {
+    "kind": "docs",
+    "acceptance": ["done"],
+    "dependencies": [],
+    "contextFiles": [],
+    "suggestedSkills": ["writer"],
+    "preferredSkill": "writer",
+    "fallbackSkills": ["default"],
+    "riskLevel": "low",
+}
+
+
+def make_taskspec(task_id: str, **overrides) -> dict:
+    return {"taskId": task_id, **_TASKSPEC_TEMPLATE, **overrides}
+
+
 def sha256_file(path: Path) -> str:
-    h = hashlib.sha256()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
+    # buffering=0 avoids double-buffering; file_digest (Py 3.11+) hashes with a
+    # large internal buffer, the fallback loop reads 1 MB at a time
+    with open(path, "rb", buffering=0) as f:
+        if hasattr(hashlib, "file_digest"):
+            return "sha256:" + hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
+        for chunk in iter(lambda: f.read(1 << 20), b""):
             h.update(chunk)
     return "sha256:" + h.hexdigest()
 
 
 def ensure_git_repo(repo: Path):
     repo.mkdir(parents=True, exist_ok=True)
-    subprocess.run(["git", "init"], cwd=repo, check=True, stdout=subprocess.DEVNULL)
-    subprocess.run(["git", "config", "user.name", "tiangong"], cwd=repo, check=True)
-    subprocess.run(["git", "config", "user.email", "tiangong@example.com"], cwd=repo, check=True)
+    subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
 
 
 def write_plan(repo: Path):
@@ -42,7 +62,12 @@ def write_plan(repo: Path):
 
 def git_commit(repo: Path, message: str):
     subprocess.run(["git", "add", "-A"], cwd=repo, check=True)
-    subprocess.run(["git", "commit", "-m", message], cwd=repo, check=True, stdout=subprocess.DEVNULL)
+    # identity via -c flags saves the two `git config` subprocesses in setup
+    subprocess.run(
+        ["git", "-c", "user.name=tiangong", "-c", "user.email=tiangong@example.com",
+         "commit", "-m", message, "-q"],
+        cwd=repo, check=True,
+    )
 
 
 def main():
@@ -50,6 +75,7 @@ def main():
     parser = argparse.ArgumentParser(description="Tiangong minimal closed-loop verification")
     parser.add_argument("--project", default=f"tg-verify-mini-{now}")
     parser.add_argument("--repo", default=str(Path("/Users/xiaokai/clawd/tmp") / f"tg-verify-mini-{now}-repo"))
+    parser.add_argument("--show-status", action="store_true", help="重放事件日志并输出 status 投影")
     args = parser.parse_args()
 
     project = args.project
@@ -67,70 +93,60 @@ def main():
     base_dir = TOOL_ROOT / "projects" / project / ".tiangong"
     sm = StateManager(base_dir)
 
-    # PROJECT_STARTED
+    # PROJECT_STARTED ... WORKER_RUN_STARTED 一批写入（单次锁 + 单次 fsync）
     start_id = run_id("start")
-    sm.append_event({
-        "type": "PROJECT_STARTED",
-        "actor": "orchestrator",
-        "project": project,
-        "runId": start_id,
-        "payload": {},
-        "idempotencyKey": f"{project}:PROJECT_STARTED:{start_id}",
-    })
-
-    # TASKSPEC_PUBLISHED
     task_id = "DOCS-1"
-    task_spec = {
-        "taskId": task_id,
-        "goal": "Create initial docs",
-        "kind": "docs",
-        "acceptance": ["README.md exists", "docs/architecture.md exists"],
-        "dependencies": [],
-        "contextFiles": ["docs/plans/plan.md"],
-        "suggestedSkills": ["writer"],
-        "preferredSkill": "writer",
-        "fallbackSkills": ["default"],
-        "riskLevel": "low",
-    }
-    sm.append_event({
-        "type": "TASKSPEC_PUBLISHED",
-        "actor": "pm",
-        "project": project,
-        "taskId": task_id,
-        "payload": {"tasks": [task_spec]},
-        "idempotencyKey": f"{project}:{task_id}:TASKSPEC_PUBLISHED",
-    })
-
-    # TASK_SKILL_SET (human)
-    sm.append_event({
-        "type": "TASK_SKILL_SET",
-        "actor": "human",
-        "project": project,
-        "taskId": task_id,
-        "payload": {"chosenSkill": "writer", "decisionSeq": 1},
-        "idempotencyKey": f"{project}:{task_id}:TASK_SKILL_SET:1",
-    })
-
-    # WORKER_RUN_INTENT + STARTED
+    task_spec = make_taskspec(
+        task_id,
+        goal="Create initial docs",
+        acceptance=["README.md exists", "docs/architecture.md exists"],
+        contextFiles=["docs/plans/plan.md"],
+    )
     run_id_val = run_id("r")
-    sm.append_event({
-        "type": "WORKER_RUN_INTENT",
-        "actor": "orchestrator",
-        "project": project,
-        "taskId": task_id,
-        "runId": run_id_val,
-        "payload": {"reason": "verify"},
-        "idempotencyKey": f"{project}:{task_id}:{run_id_val}:WORKER_RUN_INTENT",
-    })
-    sm.append_event({
-        "type": "WORKER_RUN_STARTED",
-        "actor": "orchestrator",
-        "project": project,
-        "taskId": task_id,
-        "runId": run_id_val,
-        "payload": {},
-        "idempotencyKey": f"{project}:{task_id}:{run_id_val}:WORKER_RUN_STARTED",
-    })
+    sm.append_events([
+        {
+            "type": "PROJECT_STARTED",
+            "actor": "orchestrator",
+            "project": project,
+            "runId": start_id,
+            "payload": {},
+            "idempotencyKey": f"{project}:PROJECT_STARTED:{start_id}",
+        },
+        {
+            "type": "TASKSPEC_PUBLISHED",
+            "actor": "pm",
+            "project": project,
+            "taskId": task_id,
+            "payload": {"tasks": [task_spec]},
+            "idempotencyKey": f"{project}:{task_id}:TASKSPEC_PUBLISHED",
+        },
+        {
+            "type": "TASK_SKILL_SET",
+            "actor": "human",
+            "project": project,
+            "taskId": task_id,
+            "payload": {"chosenSkill": "writer", "decisionSeq": 1},
+            "idempotencyKey": f"{project}:{task_id}:TASK_SKILL_SET:1",
+        },
+        {
+            "type": "WORKER_RUN_INTENT",
+            "actor": "orchestrator",
+            "project": project,
+            "taskId": task_id,
+            "runId": run_id_val,
+            "payload": {"reason": "verify"},
+            "idempotencyKey": f"{project}:{task_id}:{run_id_val}:WORKER_RUN_INTENT",
+        },
+        {
+            "type": "WORKER_RUN_STARTED",
+            "actor": "orchestrator",
+            "project": project,
+            "taskId": task_id,
+            "runId": run_id_val,
+            "payload": {},
+            "idempotencyKey": f"{project}:{task_id}:{run_id_val}:WORKER_RUN_STARTED",
+        },
+    ])
 
     # Simulate worker output
     (repo / "README.md").write_text("# tg-verify-mini\n\nVerification repo for Tiangong.\n", encoding="utf-8")
@@ -142,7 +158,14 @@ def main():
     patch = subprocess.check_output(["git", "diff", "--cached"], cwd=repo)
     patch_path.write_bytes(patch)
 
-    changed = subprocess.check_output(["git", "diff", "--name-only", "--cached"], cwd=repo).decode("utf-8").splitlines()
+    # changed files come from the +++ b/ headers of the patch already in
+    # memory, replacing the separate --name-only invocation; deletions show
+    # as "+++ /dev/null" and are filtered by the b/ prefix
+    changed = [
+        line[6:].decode("utf-8")
+        for line in patch.splitlines()
+        if line.startswith(b"+++ b/")
+    ]
 
     evidence_path = base_dir / "evidence" / task_id / f"{run_id_val}.md"
     evidence_path.write_text(
@@ -152,79 +175,88 @@ def main():
         encoding="utf-8",
     )
 
-    evidence_digest = sha256_file(evidence_path)
-    patch_digest = sha256_file(patch_path)
-
-    sm.append_event({
-        "type": "EVIDENCE_SUBMITTED",
-        "actor": "orchestrator",
-        "project": project,
-        "taskId": task_id,
-        "runId": run_id_val,
-        "payload": {
-            "evidencePath": str(Path("evidence") / task_id / f"{run_id_val}.md"),
-            "patchPath": str(Path("evidence") / task_id / f"{run_id_val}.patch"),
-            "evidenceDigest": evidence_digest,
-            "patchDigest": patch_digest,
-            "pathSafety": {
-                "pwd": str(repo),
-                "repoRoot": str(repo),
-                "changedFiles": changed,
+    # hashlib releases the GIL in update(), so the two digests can overlap
+    with ThreadPoolExecutor(2) as ex:
+        evidence_future = ex.submit(sha256_file, evidence_path)
+        patch_future = ex.submit(sha256_file, patch_path)
+        evidence_digest = evidence_future.result()
+        patch_digest = patch_future.result()
+
+    # EVIDENCE_SUBMITTED ... PROJECT_FINISHED 一批写入（digest 依赖上面的文件产出，
+    # 所以整条流水线拆成前后两批）
+    sm.append_events([
+        {
+            "type": "EVIDENCE_SUBMITTED",
+            "actor": "orchestrator",
+            "project": project,
+            "taskId": task_id,
+            "runId": run_id_val,
+            "payload": {
+                "evidencePath": str(Path("evidence") / task_id / f"{run_id_val}.md"),
+                "patchPath": str(Path("evidence") / task_id / f"{run_id_val}.patch"),
+                "evidenceDigest": evidence_digest,
+                "patchDigest": patch_digest,
+                "pathSafety": {
+                    "pwd": str(repo),
+                    "repoRoot": str(repo),
+                    "changedFiles": changed,
+                },
             },
+            "idempotencyKey": f"{project}:{task_id}:{run_id_val}:EVIDENCE_SUBMITTED",
         },
-        "idempotencyKey": f"{project}:{task_id}:{run_id_val}:EVIDENCE_SUBMITTED",
-    })
-
-    # Watchdog verdict PASS
-    sm.append_event({
-        "type": "WATCHDOG_VERDICT",
-        "actor": "watchdog",
-        "project": project,
-        "taskId": task_id,
-        "runId": run_id_val,
-        "payload": {"verdict": "PASS", "reasons": [], "suggestedActions": []},
-        "idempotencyKey": f"{project}:{task_id}:{run_id_val}:WATCHDOG_VERDICT",
-    })
-
-    # Worker completed + close + finish
-    sm.append_event({
-        "type": "WORKER_RUN_COMPLETED",
-        "actor": "orchestrator",
-        "project": project,
-        "taskId": task_id,
-        "runId": run_id_val,
-        "payload": {"result": "success"},
-        "idempotencyKey": f"{project}:{task_id}:{run_id_val}:WORKER_RUN_COMPLETED",
-    })
-    sm.append_event({
-        "type": "RUN_CLOSED",
-        "actor": "orchestrator",
-        "project": project,
-        "taskId": task_id,
-        "runId": run_id_val,
-        "payload": {"closeReason": "completed_with_pass", "verdictEventId": None},
-        "idempotencyKey": f"{project}:{task_id}:{run_id_val}:RUN_CLOSED",
-    })
-    sm.append_event({
-        "type": "PROJECT_FINISHED",
-        "actor": "orchestrator",
-        "project": project,
-        "runId": start_id,
-        "payload": {},
-        "idempotencyKey": f"{project}:PROJECT_FINISHED:{start_id}",
-    })
-
-    result = reduce_events(base_dir)
-    status = result.status
+        {
+            "type": "WATCHDOG_VERDICT",
+            "actor": "watchdog",
+            "project": project,
+            "taskId": task_id,
+            "runId": run_id_val,
+            "payload": {"verdict": "PASS", "reasons": [], "suggestedActions": []},
+            "idempotencyKey": f"{project}:{task_id}:{run_id_val}:WATCHDOG_VERDICT",
+        },
+        {
+            "type": "WORKER_RUN_COMPLETED",
+            "actor": "orchestrator",
+            "project": project,
+            "taskId": task_id,
+            "runId": run_id_val,
+            "payload": {"result": "success"},
+            "idempotencyKey": f"{project}:{task_id}:{run_id_val}:WORKER_RUN_COMPLETED",
+        },
+        {
+            "type": "RUN_CLOSED",
+            "actor": "orchestrator",
+            "project": project,
+            "taskId": task_id,
+            "runId": run_id_val,
+            "payload": {"closeReason": "completed_with_pass", "verdictEventId": None},
+            "idempotencyKey": f"{project}:{task_id}:{run_id_val}:RUN_CLOSED",
+        },
+        {
+            "type": "PROJECT_FINISHED",
+            "actor": "orchestrator",
+            "project": project,
+            "runId": start_id,
+            "payload": {},
+            "idempotencyKey": f"{project}:PROJECT_FINISHED:{start_id}",
+        },
+    ])
 
-    print("OK: verify complete")
-    print(json.dumps({
+    out = {
         "project": project,
         "repo": str(repo),
-        "status": status.get("project"),
-        "task": status.get("tasks"),
         "events": (base_dir / "audit" / "events.ndjson").as_posix(),
-    }, ensure_ascii=False, indent=2))
+    }
+    if args.show_status:
+        # 全量重放只为打印，默认跳过；只读 status 投影，不落 derived 文件
+        status = reduce_events(base_dir, emit_derived=False).status
+        out["status"] = status.get("project")
+        out["task"] = status.get("tasks")
+
+    # compact separators + one buffered write each, skipping the pretty-printer
+    payload = json.dumps(out, ensure_ascii=False, separators=(",", ":")).encode()
+    sys.stdout.buffer.write(b"OK: verify complete\n")
+    sys.stdout.buffer.write(payload)
+    sys.stdout.buffer.write(b"\n")
 
 
 if __name__ == "__main__":